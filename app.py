@@ -1,24 +1,50 @@
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-from datetime import datetime, timedelta, time, date
-import base64
+from datetime import timedelta
+import os
+import re
+from functools import partial
+
+from carga import (
+    ArchivoInvalido,
+    CacheBitacoras,
+    FORMATOS_SOPORTADOS,
+    hash_contenido,
+    leer_bitacora,
+)
+from demoras import AGRUPACIONES_PARETO, figura_pareto, filtrar_demoras, pareto, rollup_demoras
+from diagnostico import RUTA_LOG_DIAGNOSTICO, Cronometro, etapa
+from gantt import (
+    ARCHIVOS_LOGOS,
+    EQUIPOS_MODO_DETALLE,
+    bloques_de_equipos,
+    logos_base64,
+    titulo_gantt,
+)
+from historico import HistoricoTurnos
+from incremental import AcumuladorTurno
+from linea_tiempo import (
+    VENTANAS,
+    figura_ventana,
+    resolucion_para,
+    titulo_ventana,
+    ventana_datos,
+    ventana_dia,
+    ventana_turno,
+)
+from reportes import FORMATOS_REPORTE, TIPOS_MIME, ExportacionNoDisponible, exportar_reporte
+from tablero import procesar_turno, promedios_en_porcentaje, resaltar_rtr
+from turnos import calcular_turno, hora_local, turno_del_nombre
+from vigilancia import VigilanteBitacora
+
+# Carpeta (o archivo) que sobrescribe la exportación de despacho
+RUTA_VIGILADA = os.environ.get("BITACORA_VIGILADA", "")
+INTERVALO_VIGILANCIA = int(os.environ.get("INTERVALO_VIGILANCIA", "15"))
 
 ### now = datetime(2026, 2, 6, 8, 35)   # 06 a las 00:35 am
-now = datetime.utcnow() - timedelta(hours=5)
+now = hora_local()
 hora = now.hour
 
-if 7 <= hora < 19:
-    turno = "T/D"
-    fecha_operacion = now
-else:
-    turno = "T/N"
-    if hora < 7:
-        fecha_operacion = now - timedelta(days=1)
-    else:
-        fecha_operacion = now
-
-fecha_str = fecha_operacion.strftime("%d-%m")
+turno, fecha_operacion = calcular_turno(now)
 
 mostrar_proyeccion = False
 
@@ -27,18 +53,14 @@ if turno == "T/D" and hora >= 12:
 elif turno == "T/N" and hora >= 0:
     mostrar_proyeccion = True
 
-titulo = (
-    f"<b style='color:black; font-size:30px';font-size:10px;>"
-    f"ESTADO DE EQUIPOS - OPERACIÓN {fecha_str} {turno}"
-    f"</b>"
-)
-
-def load_image_base64(image_path):
-    with open(image_path, "rb") as f:
-        return "data:image/png;base64," + base64.b64encode(f.read()).decode()
-    
-logo_owm = load_image_base64("assets/logo_owm.png")
-logo_mmg = load_image_base64("assets/logo_mmg.png")
+# Con el servidor de estáticos de Streamlit (.streamlit/config.toml) los
+# logos van por URL y el navegador los descarga una vez; si no está
+# habilitado se incrustan en base64, leídos una sola vez por proceso.
+@st.cache_resource
+def logos():
+    if st.get_option("server.enableStaticServing"):
+        return tuple(f"app/static/{nombre}" for nombre in ARCHIVOS_LOGOS)
+    return logos_base64()
 
 st.set_page_config(page_title="Gantt por Equipo", layout="wide")
 
@@ -61,676 +83,611 @@ footer {visibility: hidden;}
 </style>
 """, unsafe_allow_html=True)
 
-file = st.file_uploader(" ", type=["xlsx"])
+@st.cache_resource
+def cache_bitacoras():
+    return CacheBitacoras(max_entradas=8)
+
+@st.cache_resource
+def historico_turnos():
+    return HistoricoTurnos()
+
+# Uno por nombre de archivo: dos pantallas con bitácoras distintas no se
+# pisan el estado
+@st.cache_resource(max_entries=8)
+def acumulador_compartido(nombre):
+    return AcumuladorTurno()
+
+# Rollup de demoras del rango, ya sumado en el histórico; los filtros por
+# equipo o tajo se aplican sobre esto sin volver a consultar
+@st.cache_resource(ttl=60, max_entries=8, show_spinner=False)
+def demoras_en_rango(desde, hasta):
+    return historico_turnos().demoras_agregadas(desde, hasta)
+
+# Las horas sueltas se anclan a la fecha del nombre del archivo si la trae
+def fecha_de_anclaje(nombre, fecha_actual):
+    _, fecha = turno_del_nombre(nombre)
+    return (fecha or fecha_actual).date()
+
+# Al histórico va con el turno de la bitácora, no con el del encabezado;
+# una bitácora de varios turnos no se guarda
+def procesar_bitacora(contenido, nombre, hash_archivo, acumulador, cronometro=None, reparar=False):
+    df = cache_bitacoras().obtener(
+        contenido, nombre, cargar=partial(leer_bitacora, cronometro=cronometro),
+        fecha=fecha_de_anclaje(nombre, fecha_operacion),
+    )
+    with etapa(cronometro, "aggregate", filas=len(df), equipos=df["Equipo"].nunique()):
+        procesado = procesar_turno(df, acumulador, reparar, nombre)
+    with etapa(cronometro, "historico"):
+        turno_bitacora = procesado.turno_bitacora
+        hash_origen = hash_archivo + (":reparado" if reparar else "")
+        historico = historico_turnos()
+        if (
+            turno_bitacora is not None
+            and historico.hash_guardado(*turno_bitacora) != hash_origen
+        ):
+            historico.guardar_turno(
+                *turno_bitacora, procesado.cubo, hash_origen=hash_origen,
+                demoras=rollup_demoras(procesado.df, *turno_bitacora),
+            )
+    return procesado
+
+# SHA-256 del archivo una vez por archivo subido o versión vigilada, no
+# en cada ejecución de la página
+def hash_del_archivo(identidad, contenido):
+    guardado = st.session_state.get("hash_archivo")
+    if guardado is None or guardado[0] != identidad:
+        guardado = (identidad, hash_contenido(contenido))
+        st.session_state["hash_archivo"] = guardado
+    return guardado[1]
+
+def figura_gantt(df, modo_flota_grande, equipos_bloque, inicio, fin, titulo):
+    return figura_ventana(
+        df, inicio, fin, titulo, logos(), modo_flota_grande, equipos_bloque
+    )
 
-def convertir_hora(x):
-    if isinstance(x, time):
-        return datetime.combine(date.today(), x)
-    try:
-        return pd.to_datetime(x)
-    except:
-        return None
-    
 # =====================================================
-# FORMULAS DE METRAJE
+# MODO COMPARTIDO ENTRE SESIONES
 # =====================================================
-FORMULAS_METRAJE = {
-    "TD011": {"a": 23.67*0.95, "b": 9.71},
-    "TD012": {"a": 25.18*0.95, "b": 6.81},
-    "TD030": {"a": 30.28*0.95, "b": 1.59},
-    "TD031": {"a": 29.96*0.95, "b": -0.31},
-    "TD072": {"a": 29.73*0.95, "b": 1.19},
-    "TD073": {"a": 30.22*0.95, "b": 1.93},
-    "TD074": {"a": 28.35*0.95, "b": 2.24},
-    "TD076": {"a": 26.86*0.95, "b": 3.30},
-    "TD077": {"a": 30.03*0.95, "b": 8.14},
-    "TD078": {"a": 26.06*0.95, "b": 5.49},
-    "TD079": {"a": 32.05*0.95, "b": 1.07},
-    "TD091": {"a": 22.45*0.80, "b": 31.79},
-    "TD092": {"a": 23.92*0.80, "b": 20.37},
-}
-
-if file:
-    df = pd.read_excel(file)
+# Agregados y figuras se guardan a nivel de proceso, por hash del archivo
+# y turno: la primera pantalla que abre un turno lo calcula y las demás
+# solo lo dibujan. Los argumentos con "_" no forman parte de la clave.
+@st.cache_resource(max_entries=8, show_spinner=False)
+def turno_compartido(clave_turno, reparar, _contenido, _nombre, _acumulador, _cronometro=None):
+    return procesar_bitacora(_contenido, _nombre, clave_turno[0], _acumulador, _cronometro, reparar)
 
-    columnas = ["Equipo", "Hora Inicio", "Hora Fin", "Descripcion", "Estado"]
-    if not all(col in df.columns for col in columnas):
-        st.error("El archivo debe contener: Equipo, Hora Inicio, Hora Fin, Descripcion, Estado")
-        st.stop()
+@st.cache_resource(max_entries=32, show_spinner=False)
+def gantt_compartido(clave_turno, reparar, titulo, inicio, fin, modo_flota_grande, i_bloque, _df, _equipos_bloque):
+    return figura_gantt(_df, modo_flota_grande, _equipos_bloque, inicio, fin, titulo)
 
-    df["Hora Inicio"] = df["Hora Inicio"].apply(convertir_hora)
-    df["Hora Fin"] = df["Hora Fin"].apply(convertir_hora)
-    df["Duracion"] = df["Hora Fin"] - df["Hora Inicio"]
-
-    df["DuracionTexto"] = df["Duracion"].apply(
-        lambda x: (
-            f"{int(x.total_seconds()//3600):02d}:{int((x.total_seconds()%3600)//60):02d}"
-            if x.total_seconds() >= 1800 else ""
-        )
+# =====================================================
+# RECARGA AUTOMÁTICA DESDE CARPETA
+# =====================================================
+# Un vigilante por ruta y por proceso. El fragmento solo hace un stat cada
+# INTERVALO_VIGILANCIA segundos; el parseo corre en el hilo del vigilante
+# y la app completa se vuelve a ejecutar solo cuando hay versión nueva.
+def cargar_en_cache(contenido, nombre):
+    _, fecha_actual = calcular_turno(hora_local())
+    return cache_bitacoras().obtener(
+        contenido, nombre, fecha=fecha_de_anclaje(nombre, fecha_actual)
     )
 
-    df = df.sort_values(["Equipo", "Hora Inicio"]).reset_index(drop=True)
-
-    hora_inicio_global = datetime.combine(date.today(), time(6, 30))
-    hora_fin_global   = datetime.combine(date.today(), time(18, 30))
+@st.cache_resource
+def vigilante_bitacora(ruta):
+    return VigilanteBitacora(ruta, cargar=cargar_en_cache)
 
-    colores_estado = {
-        "Operativo": "#00B050",
-        "Demora": "#FFC000",
-        "Stand By": "#00B0F0",
-        "Inoperativo":"#FF0000",
-    }
+@st.fragment(run_every=INTERVALO_VIGILANCIA)
+def vigilar(vigilante):
+    vigilante.revisar()
 
-    df["Color"] = df["Estado"].apply(lambda x: colores_estado.get(str(x), "#95a5a6"))
-
-    def formatear_equipo(row):
-        eq = row["Equipo"]
-        ub = str(row["Ubicacion"]).strip()
-
-        ub_base = ub.split()[0]
-
-        if ub_base == "Ferrobamba":
-            return f"<b style='color:#4085DC'>{eq}</b>"
-        elif ub_base == "Chalcobamba":
-            return f"<b style='color:#F37249'>{eq}</b>"
-        else:
-            return eq
-
-    df["Equipo_label"] = df.apply(formatear_equipo, axis=1)
-
-    fig = px.timeline(
-        df,
-        x_start="Hora Inicio",
-        x_end="Hora Fin",
-        y="Equipo_label",
-        color="Estado",
-        text="DuracionTexto",
-        color_discrete_map=colores_estado,
-        custom_data=["Descripcion", "DuracionTexto"]
+    if vigilante.error:
+        st.warning(vigilante.error)
+    st.caption(
+        f"Vigilando {vigilante.ruta} · versión {vigilante.version} · "
+        f"revisado {hora_local():%H:%M:%S}"
+        + (" · cargando…" if vigilante.cargando else "")
     )
 
-    fig.update_yaxes(
-        tickfont=dict(size=13),
-        type="category",
-        categoryorder="array",
-        categoryarray=df["Equipo_label"].drop_duplicates().tolist(),
-        autorange="reversed",
-        title=""
-    )
-    fig.update_xaxes(
-        range=[
-            hora_inicio_global,
-            hora_fin_global + timedelta(minutes=10)
-        ],
-        dtick=3600000
-    )
+    if vigilante.version != st.session_state.get("version_vigilada"):
+        st.rerun()
 
-    altura = 250 * len(df["Equipo_label"].unique())
-
-    fig.update_layout(
-        height=altura,
-
-        title=dict(
-            text=titulo,
-            x=0.5,
-            xanchor="center",
-            y=0.99
-        ),
-
-        plot_bgcolor="#ffffff",
-        paper_bgcolor="#ffffff",
-        bargap=0,
-        bargroupgap=0.65,
-        font=dict(size=13, color="black"),
-
-        margin=dict(t=160),
-
-        images=[
-            dict(
-                source=logo_owm,
-                xref="paper",
-                yref="paper",
-                x=-0.025,
-                y=1.05,
-                sizex=0.15,
-                sizey=0.15,
-                xanchor="left",
-                yanchor="top"
-            ),
-            dict(
-                source=logo_mmg,
-                xref="paper",
-                yref="paper",
-                x=0.99,
-                y=1.05,
-                sizex=0.15,
-                sizey=0.15,
-                xanchor="right",
-                yanchor="top"
-            )
-        ],
-
-        legend=dict(
-            orientation="h",
-            yanchor="top",
-            y=1.04,
-            xanchor="center",
-            x=0.475,
-            title=dict(text=""),
-            font=dict(color="black", size=20)
-        )
-    )
+# =====================================================
+# DIAGNOSTICO POR ETAPA
+# =====================================================
+# Opcional: tiempo, filas, memoria pico y bytes del JSON de cada etapa de
+# esta ejecución, en un panel plegable y en RUTA_LOG_DIAGNOSTICO (JSONL).
+def mostrar_grafico(fig, nombre, **kwargs):
+    with etapa(cronometro, f"render {nombre}") as registro:
+        st.plotly_chart(fig, **kwargs)
+    if cronometro is not None:
+        registro["bytes_json"] = len(fig.to_json())
+
+diagnostico = st.sidebar.toggle(
+    "Diagnóstico por etapa", value=os.environ.get("DIAGNOSTICO", "") == "1"
+)
+cronometro = Cronometro() if diagnostico else None
 
-    fig.update_layout(
-    annotations=[
-        dict(
-            text="🔷 Ferrobamba&nbsp;&nbsp;&nbsp;&nbsp;🔶 Chalcobamba",
-            x=0.475,
-            y=1.025,
-            xref="paper",
-            yref="paper",
-            showarrow=False,
-            font=dict(size=16, color="black"),
-            xanchor="center",
-            align="center"
-            )
-        ]
+# =====================================================
+# SECCIONES SECUNDARIAS
+# =====================================================
+# Cada sección es un fragmento: solo se dibuja si está elegida (y el
+# resumen solo calcula lo que se dibuja), y una interacción dentro de
+# ella vuelve a ejecutar solo esa sección, no el Gantt ni las demás.
+SECCIONES = {
+    "estado": "Estado actual por equipo",
+    "avance": "Avance, proyección, DM y UE",
+    "distribucion": "Distribución por demora y estado",
+    "historico": "Histórico de turnos",
+    "pareto": "Pareto de demoras",
+    "exportar": "Exportar reporte",
+}
+SECCIONES_INICIALES = [
+    s.strip() for s in os.environ.get("SECCIONES", ",".join(SECCIONES)).split(",")
+    if s.strip() in SECCIONES
+]
+
+@st.fragment
+def seccion_estado(resumen):
+    df_resumen = resumen.df_resumen
+    df_styled = df_resumen.style.apply(resaltar_rtr, axis=None)
+
+    st.markdown(
+        "<div style='margin-top:-80px; margin-bottom:-5px;'>"
+        "<h2 style='text-align:center; color:black; font-weight:700;'>"
+        "ESTADO ACTUAL POR EQUIPO"
+        "</h2>",
+        unsafe_allow_html=True
     )
-
-    fig.update_traces(
-        marker_line_color='black',
-        marker_line_width=0.5,
-        textposition="inside",
-        insidetextanchor="middle",
-        textfont=dict(color="black", size=17.5),
+    
+    st.dataframe(
+        df_styled,
+        use_container_width=True,
+        hide_index=True,
+        height=35 * (len(df_resumen) + 1)
     )
 
-    for i, row in df.iterrows():
-        desc = row["Descripcion"]
+@st.fragment
+def seccion_avance(resumen):
+    x_metros_dth = resumen.x_metros_dth
+    y_metros_rtr = resumen.y_metros_rtr
+    promedios = resumen.promedios
+
+    st.markdown(
+        "<div style='margin-top:-80px; margin-bottom:-5px;'>"
+        "<h2 style='text-align:center; color:black; font-weight:700;'>"
+        "AVANCE"
+        "</h2>",
+        unsafe_allow_html=True
+    )
 
-        if isinstance(desc, float) and pd.isna(desc):
-            continue
-        if str(desc).strip() == "":
-            continue
+    a1, a2 = st.columns(2)
 
-        # 👉 Calcular duración en minutos
-        duracion = (row["Hora Fin"] - row["Hora Inicio"]).total_seconds() / 60
+    with a1:
+        st.markdown(
+            f"""
+            <div style="text-align:center;">
+                <h1 style="
+                    font-size:60px;
+                    color:black;
+                    margin-bottom:-20px;
+                    margin-top:-60px;
+                ">
+            {x_metros_dth:,.0f}</h1>
+                <h4 style="color:black;">METROS PERFORADOS DTH</h4>
+            </div>
+            """,
+            unsafe_allow_html=True
+        )
 
-        # 👉 Mostrar texto solo si duración >= 20 min
-        if duracion <= 20:
-            continue
+    with a2:
+        st.markdown(
+            f"""
+            <div style="text-align:center;">
+                <h1 style="
+                    font-size:60px;
+                    color:black;
+                    margin-bottom:-20px;
+                    margin-top:-60px;
+                ">
+                {y_metros_rtr:,.0f}</h1>
+                <h4 style="color:black;">METROS PERFORADOS RTR</h4>
+            </div>
+            """,
+            unsafe_allow_html=True
+        )
 
-        desc_str = str(desc).strip()
+    st.markdown("<hr>", unsafe_allow_html=True)
 
-        palabras = desc_str.split()
-        if len(palabras) >= 2:
-            mitad = len(palabras) // 2
-            desc_str = " ".join(palabras[:mitad]) + "<br>" + " ".join(palabras[mitad:])
+    if mostrar_proyeccion:
+        dth_proj_txt = f"{resumen.metraje_dth_proj:,.0f}"
+        rtr_proj_txt = f"{resumen.metraje_rtr_proj:,.0f}"
+    else:
+        dth_proj_txt = "<span style='font-size:32px;'>⏳</span>"
+        rtr_proj_txt = "<span style='font-size:32px;'>⏳</span>"
 
-        fig.add_annotation(
-            x=row["Hora Inicio"] + (row["Hora Fin"] - row["Hora Inicio"]) / 2,
-            y=row["Equipo_label"],
-            text=desc_str,
-            showarrow=False,
-            yshift=70,
-            font=dict(size=20, color="black")
+    st.markdown(
+            "<div style='margin-top:-80px; margin-bottom:-5px;'>"
+            "<h2 style='text-align:center; color:black; font-weight:700;'>PROYECCIÓN</h2>",
+            unsafe_allow_html=True
         )
 
-    fig.update_xaxes(title_font=dict(color="black"), tickfont=dict(color="black", size=16))
-    fig.update_yaxes(title_font=dict(color="black"), tickfont=dict(color="black", size=20))
-
-    fig.update_xaxes(dtick=3600000)
+    p1, p2 = st.columns(2)
 
-    hora_actual = hora_inicio_global
-    equipos_unicos = len(df["Equipo_label"].unique())
-
-    while hora_actual <= hora_fin_global:
-        fig.add_shape(
-            type="line",
-            x0=hora_actual, x1=hora_actual,
-            y0=-0.5, y1=equipos_unicos - 0.5,
-            line=dict(color="lightgray", width=1, dash="dot"),
-            layer="below"
+    with p1:
+        st.markdown(
+            f"""
+            <div style="text-align:center;">
+                <h1 style="
+                    font-size:60px;
+                    color:#1F4ED8;
+                    margin-bottom:-20px;
+                    margin-top:-60px;
+                ">
+                    {dth_proj_txt}
+                </h1>
+                <h4 style="color:black;">
+                    METROS PROYECTADOS DTH
+                </h4>
+            </div>
+            """,
+            unsafe_allow_html=True
         )
-        hora_actual += timedelta(hours=0.5)
 
-    st.plotly_chart(fig, use_container_width=True, key="gantt_1")
-    
-    df_sorted = df.sort_values(["Equipo", "Hora Fin"])
-
-    df_estado_actual = (
-        df_sorted
-        .groupby("Equipo")
-        .tail(1)
-        [["Equipo", "Estado", "Ubicacion"]]
-        .rename(columns={"Ubicacion": "Ubicación / Frente"})
+    with p2:
+        st.markdown(
+            f"""
+            <div style="text-align:center;">
+                <h1 style="
+                    font-size:60px;
+                    color:#1F4ED8;
+                    margin-bottom:-20px;
+                    margin-top:-60px;
+                ">
+                    {rtr_proj_txt}</h1>
+                <h4 style="color:black;">
+                    METROS PROYECTADOS RTR
+                </h4>
+            </div>
+            """,
+            unsafe_allow_html=True
+        )
+    st.markdown(
+        """
+        <div style="
+            width:80%;
+            height:1px;
+            margin:25px auto 20px auto;
+            background: linear-gradient(
+                to right,
+                transparent,
+                #B0B0B0,
+                transparent
+            );
+        "></div>
+        """,
+        unsafe_allow_html=True
     )
 
-    df_prod = df[df["Estado"] == "Operativo"].copy()
-    df_prod["Minutos"] = df_prod["Duracion"].dt.total_seconds() / 60
-
-    df_prod_acum = (
-        df_prod
-        .groupby("Equipo")["Minutos"]
-        .sum()
-        .reset_index()
+    st.markdown(
+        "<h4 style='text-align:center; color:black; font-weight:700;'>"
+        "DISPONILIDAD MECANICA Y UTILIZACION EFECTIVA"
+        "</h4>",
+        unsafe_allow_html=True
     )
-
-    def minutos_a_hhmm(mins):
-        h = int(mins // 60)
-        m = int(mins % 60)
-        return f"{h:02d}:{m:02d}"
-
-    df_prod_acum["Producción acumulada"] = df_prod_acum["Minutos"].apply(minutos_a_hhmm)
-
-    df_resumen = df_estado_actual.merge(
-        df_prod_acum[["Equipo", "Producción acumulada"]],
-        on="Equipo",
-        how="left"
+    st.dataframe(
+        promedios_en_porcentaje(promedios),
+        use_container_width=True,
+        hide_index=True
     )
 
-    df_resumen["Producción acumulada"] = df_resumen["Producción acumulada"].fillna("00:00")
-
-    df_resumen = df_resumen.sort_values("Equipo").reset_index(drop=True)
-
-    df_op = df[df["Estado"] == "Operativo"].copy()
-    df_op["Horas"] = df_op["Duracion"].dt.total_seconds() / 3600
-
-    horas_por_equipo = df_op.groupby("Equipo")["Horas"].sum().reset_index()
+@st.fragment
+def seccion_distribucion(resumen):
+    col1, col2 = st.columns(2)
+    with col1:
+        mostrar_grafico(resumen.fig_pie, "pie demoras", use_container_width=True)
 
-    def calcular_metraje(row):
-        eq = row["Equipo"]
-        h = row["Horas"]
-        if eq in FORMULAS_METRAJE:
-            a = FORMULAS_METRAJE[eq]["a"]
-            b = FORMULAS_METRAJE[eq]["b"]
-            return a * h + b
-        return 0
+        st.markdown(
+            "<h3 style='text-align:center; font-weight:700; color:black;'>"
+            "DISTRIBUCIÓN POR DEMORA"
+            "</h3>",
+            unsafe_allow_html=True
+        )
 
-    horas_por_equipo["Metraje acumulado (m)"] = horas_por_equipo.apply(calcular_metraje, axis=1)
+    with col2:
+        mostrar_grafico(resumen.fig_pie_estado, "pie estados", use_container_width=True)
+        st.markdown(
+            "<h3 style='text-align:center; font-weight:700; color:black;'>"
+            "DISTRIBUCIÓN POR ESTADO"
+            "</h3>",
+            unsafe_allow_html=True
+        )
 
-    df_dth = horas_por_equipo[
-        ~horas_por_equipo["Equipo"].isin(["TD091", "TD092"])
-    ]
+# El reporte sale del turno ya procesado y del Gantt que está en pantalla;
+# se genera solo al pedirlo y queda en la sesión para descargarlo.
+@st.fragment
+# El Gantt del reporte se arma recién al generarlo (gantt_reporte())
+def seccion_exportar(procesado, gantt_reporte, clave, nombre_base):
+    formato = st.selectbox("Formato", FORMATOS_REPORTE, format_func=str.upper)
+
+    if st.button("Generar reporte"):
+        try:
+            st.session_state["reporte"] = (
+                (clave, formato), exportar_reporte(procesado, gantt_reporte(), formato)
+            )
+        except ExportacionNoDisponible as e:
+            st.error(str(e))
+
+    reporte = st.session_state.get("reporte")
+    if reporte is not None and reporte[0] == (clave, formato):
+        st.download_button(
+            "Descargar",
+            reporte[1],
+            file_name=f"{nombre_base}.{formato}",
+            mime=TIPOS_MIME[formato],
+        )
 
-    df_rtr = horas_por_equipo[
-        horas_por_equipo["Equipo"].isin(["TD091", "TD092"])
-    ]
+@st.fragment
+def seccion_historico():
+    hoy = fecha_operacion.date()
+    rango = st.date_input("Rango de fechas", value=(hoy - timedelta(days=27), hoy))
 
-    x_metros_dth = df_dth["Metraje acumulado (m)"].sum()
-    y_metros_rtr = df_rtr["Metraje acumulado (m)"].sum()
+    if len(rango) == 2:
+        df_hist = historico_turnos().tendencia(*rango)
 
-    HORAS_TURNO = 12
+        if df_hist.empty:
+            st.info("No hay turnos guardados en el rango seleccionado.")
+        else:
+            df_hist["Turno"] = df_hist["fecha"] + " " + df_hist["turno"]
 
-    df_eq = (
-        df.groupby(["Equipo", "Estado"])["Duracion"]
-        .sum()
-        .reset_index()
-    )
+            tendencia = (
+                df_hist.groupby(["Turno", "Tipo"])
+                .agg(DM=("DM", "mean"), UE=("UE", "mean"), Metraje=("Metraje (m)", "sum"))
+                .unstack("Tipo")
+            )
+            tendencia.columns = [f"{kpi} {tipo}" for kpi, tipo in tendencia.columns]
 
-    df_eq["Horas"] = df_eq["Duracion"].dt.total_seconds() / 3600
+            st.line_chart(tendencia.filter(regex="^(DM|UE) ") * 100)
+            st.bar_chart(tendencia.filter(regex="^Metraje "))
 
-    df_total = (
-        df_eq.groupby("Equipo")["Horas"]
-        .sum()
-        .reset_index(name="Horas_totales")
+@st.fragment
+def seccion_pareto():
+    hoy = fecha_operacion.date()
+    rango = st.date_input(
+        "Rango de fechas", value=(hoy - timedelta(days=27), hoy), key="rango_pareto"
     )
-
-    df_op = (
-        df_eq[df_eq["Estado"] == "Operativo"]
-        .groupby("Equipo")["Horas"]
-        .sum()
-        .reset_index(name="Horas_operativas")
+    if len(rango) != 2:
+        return
+
+    rollup = demoras_en_rango(*rango)
+    if rollup.empty:
+        st.info("No hay demoras guardadas en el rango seleccionado.")
+        return
+
+    col1, col2, col3, col4 = st.columns([2, 2, 1.5, 1])
+    equipos = col1.multiselect("Equipos", sorted(rollup["Equipo"].dropna().unique()))
+    tajos = col2.multiselect("Tajos", sorted(rollup["Tajo"].dropna().unique()))
+    por = col3.selectbox(
+        "Agrupar por", list(AGRUPACIONES_PARETO), format_func=AGRUPACIONES_PARETO.get
     )
+    top = col4.number_input("Top", min_value=1, value=10)
 
-    df_proj = df_total.merge(df_op, on="Equipo", how="left")
-    df_proj["Horas_operativas"] = df_proj["Horas_operativas"].fillna(0)
+    tabla = pareto(filtrar_demoras(rollup, equipos, tajos), por, top)
+    if tabla.empty:
+        st.info("No hay demoras para los filtros elegidos.")
+        return
 
-    df_proj["Operatividad"] = df_proj["Horas_operativas"] / df_proj["Horas_totales"]
+    mostrar_grafico(figura_pareto(tabla, por), "pareto demoras", use_container_width=True)
+    st.dataframe(tabla.round(1), use_container_width=True, hide_index=True)
 
-    horas_totales_flota = df_proj["Horas_totales"].sum()
-    horas_operativas_flota = df_proj["Horas_operativas"].sum()
-
-    porc_operatividad_flota = (
-        horas_operativas_flota / horas_totales_flota
-        if horas_totales_flota > 0 else 0
-    )
-
-    porc_operatividad_proyectada = porc_operatividad_flota
-
-    df_proj["Operatividad Flota (%)"] = porc_operatividad_flota * 100
-
-    df_proj["Horas_proj"] = df_proj["Operatividad"] * HORAS_TURNO
-
-    def metraje_proyectado(row):
-        eq = row["Equipo"]
-        h = row["Horas_proj"]
-
-        if h <= 0:
-            return 0
-
-        if eq in FORMULAS_METRAJE:
-            a = FORMULAS_METRAJE[eq]["a"]
-            b = FORMULAS_METRAJE[eq]["b"]
-            return a * h + b
-
-        return 0
-
-    df_proj["Metraje_proyectado (m)"] = df_proj.apply(metraje_proyectado, axis=1)
-
-    metraje_dth_proj = df_proj[
-        ~df_proj["Equipo"].isin(["TD091", "TD092"])
-    ]["Metraje_proyectado (m)"].sum()
-
-    metraje_rtr_proj = df_proj[
-        df_proj["Equipo"].isin(["TD091", "TD092"])
-    ]["Metraje_proyectado (m)"].sum()
-
-    def resaltar_rtr(row):
-        if row["Equipo"] in ["TD091", "TD092"]:
-            return ["background-color: #00B050"] * len(row)
-        return [""] * len(row)
-
-    df_styled = df_resumen.style.apply(resaltar_rtr, axis=1)
-
-    df["Horas"] = df["Duracion"].dt.total_seconds() / 3600
-
-    df_cat = (
-        df.groupby(["Equipo", "Categoria"])["Horas"]
-        .sum()
-        .reset_index()
-    )
-
-    df_pivot = df_cat.pivot_table(
-        index="Equipo",
-        columns="Categoria",
-        values="Horas",
-        fill_value=0
-    ).reset_index()
-
-    df_pivot["DM"] = (
-    (
-        df_pivot.get("Tiempo de Producción", 0) + 
-        df_pivot.get("Tiempo de NO Producción", 0) + 
-        df_pivot.get("Retraso Operativo Planificado", 0) + 
-        df_pivot.get("Retraso Operativo NO Planificado", 0) 
-    )/
-    (
-        df_pivot.get("Tiempo de Producción", 0) +
-        df_pivot.get("Tiempo de NO Producción", 0) +
-        df_pivot.get("Retraso Operativo Planificado", 0) +
-        df_pivot.get("Retraso Operativo NO Planificado", 0) +
-        df_pivot.get("PERDIDA DE EQUIPO PLANIFICADA", 0) +
-        df_pivot.get("PERDIDA DE EQUIPO NO PLANIFICADA", 0) + 
-        df_pivot.get("ECT", 0)
-    )
-    )
-
-    df_pivot["DM"] = df_pivot["DM"].fillna(0)
+secciones = st.sidebar.multiselect(
+    "Secciones visibles",
+    list(SECCIONES),
+    default=SECCIONES_INICIALES,
+    format_func=SECCIONES.get,
+)
 
-    df_pivot["UE"] = (
-    df_pivot.get("Tiempo de Producción", 0) /
-    (
-        df_pivot.get("Tiempo de Producción", 0) +
-        df_pivot.get("Tiempo de NO Producción", 0) +
-        df_pivot.get("Retraso Operativo Planificado", 0) +
-        df_pivot.get("Retraso Operativo NO Planificado", 0)
-    )
-    )
+contenido = nombre = identidad = None
 
-    df_pivot["UE"] = df_pivot["UE"].fillna(0)
+modo_vigilado = st.sidebar.toggle(
+    "Recarga automática desde carpeta", value=bool(RUTA_VIGILADA)
+)
 
-    df_pivot["Tipo"] = df_pivot["Equipo"].apply(
-    lambda x: "RTR" if x in ["TD091", "TD092"] else "DTH"
+if modo_vigilado:
+    ruta_vigilada = st.sidebar.text_input("Carpeta o archivo vigilado", value=RUTA_VIGILADA)
+    if ruta_vigilada:
+        vigilante = vigilante_bitacora(ruta_vigilada)
+        version, contenido, nombre = vigilante.actual()
+        identidad = (ruta_vigilada, version)
+        st.session_state["version_vigilada"] = version
+        with st.sidebar:
+            vigilar(vigilante)
+        if contenido is None:
+            st.info("Esperando la primera bitácora de la carpeta vigilada…")
+else:
+    file = st.file_uploader(" ", type=FORMATOS_SOPORTADOS)
+    if file:
+        contenido, nombre, identidad = file.getvalue(), file.name, file.file_id
+
+if contenido:
+    hash_archivo = hash_del_archivo(identidad, contenido)
+    clave_turno = (hash_archivo, fecha_operacion.date(), turno)
+
+    compartido = st.sidebar.toggle("Modo compartido entre sesiones", value=True)
+    incremental = st.sidebar.toggle(
+        "Recarga incremental", value=False,
+        help="Para bitácoras que solo crecen por el final (carpeta vigilada)",
     )
-
-    promedios = (
-        df_pivot.groupby("Tipo")[["DM", "UE"]]
-        .mean()
-        .reset_index()
+    reparar = st.sidebar.toggle(
+        "Reparar solapes", value=False,
+        help="Recorta intervalos solapados y descarta filas sin hora o con duración negativa",
     )
 
-    st.markdown("<hr>", unsafe_allow_html=True)
-    col1, col2 = st.columns([1.1, 1])
-
-    with col1:               
-        st.markdown(
-            "<div style='margin-top:-80px; margin-bottom:-5px;'>"
-            "<h2 style='text-align:center; color:black; font-weight:700;'>"
-            "ESTADO ACTUAL POR EQUIPO"
-            "</h2>",
-            unsafe_allow_html=True
-        )
-        
-        st.dataframe(
-            df_styled,
-            use_container_width=True,
-            hide_index=True,
-            height=35 * (len(df_resumen) + 1)
-        )
-
-    with col2:
-
-        st.markdown(
-            "<div style='margin-top:-80px; margin-bottom:-5px;'>"
-            "<h2 style='text-align:center; color:black; font-weight:700;'>"
-            "AVANCE"
-            "</h2>",
-            unsafe_allow_html=True
-        )
-
-        a1, a2 = st.columns(2)
-
-        with a1:
-            st.markdown(
-                f"""
-                <div style="text-align:center;">
-                    <h1 style="
-                        font-size:60px;
-                        color:black;
-                        margin-bottom:-20px;
-                        margin-top:-60px;
-                    ">
-                {x_metros_dth:,.0f}</h1>
-                    <h4 style="color:black;">METROS PERFORADOS DTH</h4>
-                </div>
-                """,
-                unsafe_allow_html=True
-            )
+    if not incremental:
+        acumulador = None
+    elif compartido:
+        acumulador = acumulador_compartido(nombre)
+    else:
+        acumulador = st.session_state.setdefault("acumulador_turno", AcumuladorTurno())
 
-        with a2:
-            st.markdown(
-                f"""
-                <div style="text-align:center;">
-                    <h1 style="
-                        font-size:60px;
-                        color:black;
-                        margin-bottom:-20px;
-                        margin-top:-60px;
-                    ">
-                    {y_metros_rtr:,.0f}</h1>
-                    <h4 style="color:black;">METROS PERFORADOS RTR</h4>
-                </div>
-                """,
-                unsafe_allow_html=True
+    try:
+        if compartido:
+            procesado = turno_compartido(
+                clave_turno, reparar, contenido, nombre, acumulador, cronometro
             )
-
-        st.markdown("<hr>", unsafe_allow_html=True)
-
-        if mostrar_proyeccion:
-            dth_proj_txt = f"{metraje_dth_proj:,.0f}"
-            rtr_proj_txt = f"{metraje_rtr_proj:,.0f}"
         else:
-            dth_proj_txt = "<span style='font-size:32px;'>⏳</span>"
-            rtr_proj_txt = "<span style='font-size:32px;'>⏳</span>"
-
-        st.markdown(
-                "<div style='margin-top:-80px; margin-bottom:-5px;'>"
-                "<h2 style='text-align:center; color:black; font-weight:700;'>PROYECCIÓN</h2>",
-                unsafe_allow_html=True
-            )
-
-        p1, p2 = st.columns(2)
-
-        with p1:
-            st.markdown(
-                f"""
-                <div style="text-align:center;">
-                    <h1 style="
-                        font-size:60px;
-                        color:#1F4ED8;
-                        margin-bottom:-20px;
-                        margin-top:-60px;
-                    ">
-                        {dth_proj_txt}
-                    </h1>
-                    <h4 style="color:black;">
-                        METROS PROYECTADOS DTH
-                    </h4>
-                </div>
-                """,
-                unsafe_allow_html=True
+            procesado = procesar_bitacora(
+                contenido, nombre, hash_archivo, acumulador, cronometro, reparar
             )
+    except ArchivoInvalido as e:
+        st.error(str(e))
+        st.stop()
 
-        with p2:
-            st.markdown(
-                f"""
-                <div style="text-align:center;">
-                    <h1 style="
-                        font-size:60px;
-                        color:#1F4ED8;
-                        margin-bottom:-20px;
-                        margin-top:-60px;
-                    ">
-                        {rtr_proj_txt}</h1>
-                    <h4 style="color:black;">
-                        METROS PROYECTADOS RTR
-                    </h4>
-                </div>
-                """,
-                unsafe_allow_html=True
-            )
-        st.markdown(
-            """
-            <div style="
-                width:80%;
-                height:1px;
-                margin:25px auto 20px auto;
-                background: linear-gradient(
-                    to right,
-                    transparent,
-                    #B0B0B0,
-                    transparent
-                );
-            "></div>
-            """,
-            unsafe_allow_html=True
+    cache = cache_bitacoras()
+    st.sidebar.caption(
+        f"Caché de bitácoras: {cache.hits} aciertos · {cache.misses} fallos · "
+        f"{len(cache)}/{cache.max_entradas} entradas"
+    )
+    if acumulador is not None:
+        st.sidebar.caption(
+            f"Recarga incremental: {acumulador.nuevos} nuevos · "
+            f"{acumulador.modificados} modificados · {acumulador.eliminados} eliminados · "
+            f"{len(acumulador.equipos_recalculados)} equipos recalculados"
         )
 
-        st.markdown(
-            "<h4 style='text-align:center; color:black; font-weight:700;'>"
-            "DISPONILIDAD MECANICA Y UTILIZACION EFECTIVA"
-            "</h4>",
-            unsafe_allow_html=True
-        )
-        st.dataframe(
-            promedios.assign(
-                DM=lambda x: (x["DM"] * 100).round(1).astype(str) + "%",
-                UE=lambda x: (x["UE"] * 100).round(1).astype(str) + "%",
-            ),
-            use_container_width=True,
-            hide_index=True
+    if procesado.turno_bitacora is None:
+        st.sidebar.caption(
+            "Histórico: la bitácora abarca varios turnos y no se guarda"
         )
 
-    col1, col2 = st.columns(2)
-    with col1:
-        df_demora = df[df["Estado"] == "Demora"].copy()
+    validacion = procesado.validacion
+    if len(procesado.problemas):
+        st.sidebar.warning(
+            f"Bitácora con problemas: {validacion['Solapes']} solapes "
+            f"({validacion['Horas solapadas']:.1f} h), {validacion['Huecos']} huecos "
+            f"({validacion['Horas sin registro']:.1f} h), {validacion['Sin hora']} sin hora, "
+            f"{validacion['Duración negativa']} con duración negativa"
+            + (" · reparada" if reparar else "")
+        )
 
-        df_demora["Duracion_min"] = df_demora["Duracion"].dt.total_seconds() / 60
+    df = procesado.df
+    n_equipos = df["Equipo"].nunique()
 
-        df_pie = df_demora.groupby("Descripcion")["Duracion_min"].sum().reset_index()
+    # Ventana del Gantt: un turno, un día de operación (T/D + T/N) o todo
+    # lo que trae la bitácora. Por defecto, el turno del encabezado.
+    ventana = st.sidebar.radio(
+        "Ventana del Gantt", list(VENTANAS), format_func=VENTANAS.get, horizontal=True
+    )
+    turno_encabezado = (fecha_operacion.date(), turno)
+    turnos_bitacora = procesado.turnos or [turno_encabezado]
+
+    if ventana == "turno":
+        elegido = st.sidebar.selectbox(
+            "Turno",
+            turnos_bitacora,
+            index=turnos_bitacora.index(turno_encabezado)
+            if turno_encabezado in turnos_bitacora else len(turnos_bitacora) - 1,
+            format_func=lambda t: f"{t[0]:%d-%m} {t[1]}",
+        )
+        inicio, fin = ventana_turno(*elegido)
+        operacion = titulo_ventana(ventana, inicio, fin, elegido[1])
+    elif ventana == "dia":
+        dias = sorted({fecha for fecha, _ in turnos_bitacora})
+        dia = st.sidebar.selectbox(
+            "Día de operación",
+            dias,
+            index=dias.index(fecha_operacion.date())
+            if fecha_operacion.date() in dias else len(dias) - 1,
+            format_func=lambda d: f"{d:%d-%m}",
+        )
+        inicio, fin = ventana_dia(dia)
+        operacion = titulo_ventana(ventana, inicio, fin)
+    else:
+        inicio, fin = ventana_datos(df)
+        operacion = titulo_ventana(ventana, inicio, fin)
+    titulo = titulo_gantt(operacion)
 
-        df_pie["Porcentaje"] = (df_pie["Duracion_min"] / df_pie["Duracion_min"].sum()) * 100
+    modo_flota_grande = st.sidebar.toggle(
+        "Modo flota grande (WebGL)",
+        value=n_equipos > EQUIPOS_MODO_DETALLE or resolucion_para(inicio, fin) is not None,
+    )
 
-        fig_pie = px.pie(
-            df_pie,
-            names="Descripcion",
-            values="Duracion_min",
-            hover_data=["Duracion_min", "Porcentaje"],
-            labels={"Duracion_min":"Minutos", "Descripcion":"Tipo de demora"}
+    bloques = bloques_de_equipos(df)
+    i_bloque = 0
+    if modo_flota_grande and len(bloques) > 1:
+        i_bloque = st.sidebar.selectbox(
+            "Bloque de equipos",
+            range(len(bloques)),
+            format_func=lambda i: f"{bloques[i][0]} – {bloques[i][-1]}",
         )
 
-        fig_pie.update_traces(
-            textinfo="percent+label",
-            hovertemplate="<b>%{label}</b><br>Tiempo acumulado: %{value:.0f} min<br>Porcentaje: %{percent}"
-        )
-        fig_pie.update_layout(
-            paper_bgcolor="white",
-            plot_bgcolor="white",
-            font=dict(color="black"),
-            legend=dict(
-                font=dict(color="black"),
-                bgcolor="rgba(0,0,0,0)",
-                borderwidth=0
+    with etapa(cronometro, "figure", webgl=modo_flota_grande):
+        if compartido:
+            fig = gantt_compartido(
+                clave_turno, reparar, titulo, inicio, fin, modo_flota_grande, i_bloque,
+                df, bloques[i_bloque],
             )
-        )
-
-        st.plotly_chart(fig_pie, use_container_width=True)
+        else:
+            fig = figura_gantt(df, modo_flota_grande, bloques[i_bloque], inicio, fin, titulo)
 
-        st.markdown(
-            "<h3 style='text-align:center; font-weight:700; color:black;'>"
-            "DISTRIBUCIÓN POR DEMORA"
-            "</h3>",
-            unsafe_allow_html=True
+    mostrar_grafico(fig, "gantt", use_container_width=True, key="gantt_1")
+    if fig.layout.updatemenus:
+        st.caption(
+            "Tajo o tipo de equipo: menú del gráfico · Estados: clic en la leyenda "
+            "(doble clic aísla uno). Se filtra en el navegador, sin recargar."
         )
 
-    with col2:
-        df_estado = df.copy()
-        df_estado["Duracion_min"] = df_estado["Duracion"].dt.total_seconds() / 60 
-        df_pie_estado = df_estado.groupby("Estado")["Duracion_min"].sum().reset_index()
+    resumen = procesado.resumen
 
-        def min_a_hhmm(minutos):
-            h = int(minutos // 60)
-            m = int(minutos % 60)
-            return f"{h:02d}:{m:02d}"
+    if {"estado", "avance"} & set(secciones):
+        st.markdown("<hr>", unsafe_allow_html=True)
+        col1, col2 = st.columns([1.1, 1])
 
-        df_pie_estado["Duracion_HHMM"] = df_pie_estado["Duracion_min"].apply(min_a_hhmm)
+        if "estado" in secciones:
+            with col1:
+                seccion_estado(resumen)
 
-        df_pie_estado["Porcentaje"] = (df_pie_estado["Duracion_min"] / df_pie_estado["Duracion_min"].sum()) * 100
+        if "avance" in secciones:
+            with col2:
+                seccion_avance(resumen)
 
-        fig_pie_estado = px.pie(
-            df_pie_estado,
-            names="Estado",
-            values="Duracion_min",
-            color="Estado",
-            color_discrete_map=colores_estado,
-        )
+    if "distribucion" in secciones:
+        seccion_distribucion(resumen)
 
-        fig_pie_estado.update_traces(
-            customdata=df_pie_estado[["Duracion_HHMM", "Porcentaje"]],
-            texttemplate="%{label}<br>%{customdata[0]}<br>%{percent}",  # <-- incluir %{label}
-            textposition="inside",
-            textfont=dict(color="black", size=14),
-            hovertemplate="<b>%{label}</b><br>Tiempo acumulado: %{customdata[0]}<br>Porcentaje: %{customdata[1]:.1f}%"
-        )
+    if len(procesado.problemas):
+        with st.expander("VALIDACIÓN DE INTERVALOS"):
+            st.dataframe(procesado.problemas, use_container_width=True, hide_index=True)
 
-        fig_pie_estado.update_layout(
-            paper_bgcolor="white",
-            plot_bgcolor="white",
-            font=dict(color="black"),
-            legend=dict(
-                font=dict(color="black"),
-                bgcolor="rgba(0,0,0,0)",
-                borderwidth=0
+    if "exportar" in secciones:
+        # En modo flota grande el Gantt en pantalla es un solo bloque; el
+        # reporte lleva todos los equipos, como en lote.py
+        if modo_flota_grande and len(bloques) > 1:
+            def gantt_reporte():
+                return figura_gantt(df, modo_flota_grande, None, inicio, fin, titulo)
+        else:
+            def gantt_reporte():
+                return fig
+
+        with st.expander("EXPORTAR REPORTE"):
+            seccion_exportar(
+                procesado, gantt_reporte,
+                (clave_turno, reparar, operacion, modo_flota_grande),
+                "reporte_" + re.sub(r"\W+", "_", operacion).strip("_"),
             )
-        )
 
-        st.plotly_chart(fig_pie_estado, use_container_width=True)
-        st.markdown(
-            "<h3 style='text-align:center; font-weight:700; color:black;'>"
-            "DISTRIBUCIÓN POR ESTADO"
-            "</h3>",
-            unsafe_allow_html=True
-        )
+if "historico" in secciones:
+    with st.expander("HISTÓRICO DE TURNOS"):
+        seccion_historico()
 
+if "pareto" in secciones:
+    with st.expander("PARETO DE DEMORAS"):
+        seccion_pareto()
 
+if cronometro is not None:
+    total = cronometro.cerrar()
+    cronometro.escribir_log(
+        archivo=nombre,
+        equipos=df["Equipo"].nunique() if contenido else 0,
+        segundos_total=total,
+    )
+    with st.expander("DIAGNÓSTICO DE RENDIMIENTO"):
+        st.caption(f"Ejecución completa: {total:.3f} s · registro en {RUTA_LOG_DIAGNOSTICO}")
+        st.dataframe(cronometro.tabla(), use_container_width=True, hide_index=True)
@@ -0,0 +1,266 @@
+import argparse
+import io
+import itertools
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from carga import FORMATOS_SOPORTADOS, leer_bitacora
+from diagnostico import Cronometro
+from equipos import REGISTRO
+from gantt import COLORES_ESTADO, EQUIPOS_MODO_DETALLE, bloques_de_equipos
+from linea_tiempo import figura_ventana, ventana_datos
+from lote import escribir_tabla
+from tablero import procesar_turno
+
+ETAPAS = ["parse", "normalize", "aggregate", "figure", "serialize"]
+
+# Categorías del pivot de DM/UE que puede tener cada Estado
+CATEGORIAS_ESTADO = {
+    "Operativo": ["Tiempo de Producción"],
+    "Demora": ["Retraso Operativo Planificado", "Retraso Operativo NO Planificado"],
+    "Stand By": ["Tiempo de NO Producción", "ECT"],
+    "Inoperativo": ["PERDIDA DE EQUIPO PLANIFICADA", "PERDIDA DE EQUIPO NO PLANIFICADA"],
+}
+DESCRIPCIONES = [
+    "Cambio de broca", "Traslado", "Voladura en zona", "Falta de operador",
+    "Refrigerio", "Mantenimiento preventivo", "Espera de tractor", None,
+]
+UBICACIONES = ["Ferrobamba Fase 5", "Ferrobamba Fase 6", "Chalcobamba F2", "Chalcobamba F3"]
+DURACIONES_MIN = [5, 10, 15, 25, 45, 60, 90, 120]
+
+LOGOS = ("app/static/logo_owm.png", "app/static/logo_mmg.png")
+
+
+# =====================================================
+# GENERADOR DE BITACORAS SINTETICAS
+# =====================================================
+# Mismo esquema que la exportación de despacho: los equipos del registro
+# más equipos extra, turnos consecutivos de 12 h desde las
+# 07:00 del día 1. Con un solo turno las horas van como time (como en la
+# exportación real); con varios, como fecha y hora completas.
+def generar_bitacora(n_equipos, n_turnos=1, semilla=0, inicio=datetime(2026, 1, 1, 7)):
+    rng = np.random.default_rng(semilla)
+
+    equipos = list(REGISTRO.index)[:n_equipos]
+    equipos += [f"TD{200 + i:03d}" for i in range(n_equipos - len(equipos))]
+
+    # Intervalos por (equipo, turno): se sortean duraciones de sobra y se
+    # cortan en el fin del turno
+    minutos_turno = 12 * 60
+    n_max = minutos_turno // min(DURACIONES_MIN) + 1
+    n_bloques = n_equipos * n_turnos
+
+    duraciones = rng.choice(DURACIONES_MIN, size=(n_bloques, n_max))
+    fin = duraciones.cumsum(axis=1)
+    ini = fin - duraciones
+    validos = ini < minutos_turno
+    fin = np.minimum(fin, minutos_turno)
+
+    bloque = np.repeat(np.arange(n_bloques), n_max).reshape(n_bloques, n_max)[validos]
+    ini, fin = ini[validos], fin[validos]
+    n = len(ini)
+
+    turno = bloque % n_turnos
+    base = pd.Timestamp(inicio) + pd.to_timedelta(turno * 12, unit="h")
+    hora_inicio = base + pd.to_timedelta(ini, unit="min")
+    hora_fin = base + pd.to_timedelta(fin, unit="min")
+
+    estados = np.array(list(COLORES_ESTADO))
+    estado = estados[rng.choice(len(estados), size=n, p=[0.55, 0.25, 0.12, 0.08])]
+
+    categoria = np.empty(n, dtype=object)
+    for e, opciones in CATEGORIAS_ESTADO.items():
+        m = estado == e
+        categoria[m] = rng.choice(opciones, size=m.sum())
+
+    descripcion = np.array(DESCRIPCIONES, dtype=object)[rng.integers(len(DESCRIPCIONES), size=n)]
+    descripcion[estado == "Operativo"] = None
+
+    ubicacion_equipo = np.array(UBICACIONES, dtype=object)[rng.integers(len(UBICACIONES), size=n_equipos)]
+
+    df = pd.DataFrame({
+        "Equipo": np.array(equipos, dtype=object)[bloque // n_turnos],
+        "Hora Inicio": hora_inicio,
+        "Hora Fin": hora_fin,
+        "Descripcion": descripcion,
+        "Estado": estado,
+        "Ubicacion": ubicacion_equipo[bloque // n_turnos],
+        "Categoria": categoria,
+    })
+
+    if n_turnos == 1:
+        df["Hora Inicio"] = df["Hora Inicio"].dt.time
+        df["Hora Fin"] = df["Hora Fin"].dt.time
+
+    return df
+
+
+def serializar(df, formato):
+    buffer = io.BytesIO()
+    if formato == "xlsx":
+        df.to_excel(buffer, index=False)
+    elif formato == "csv":
+        df.to_csv(buffer, index=False)
+    elif formato == "parquet":
+        df.to_parquet(buffer, index=False)
+    else:
+        df.to_feather(buffer)
+    return buffer.getvalue()
+
+
+# =====================================================
+# ETAPAS DEL PIPELINE
+# =====================================================
+# Las mismas funciones que llama el tablero por cada bitácora:
+# leer_bitacora (parse y normalize, con su propio cronómetro),
+# procesar_turno más lo que la página muestra del resumen, y
+# figura_ventana con la regla de la app (WebGL y primer bloque de equipos
+# en flotas grandes).
+def _resumen(procesado):
+    resumen = procesado.resumen
+    return (
+        resumen.df_resumen, resumen.x_metros_dth, resumen.metraje_dth_proj, resumen.promedios
+    )
+
+
+def _figuras(procesado):
+    df = procesado.df
+    inicio, fin = ventana_datos(df)
+    gantt = figura_ventana(
+        df, inicio, fin, "", LOGOS,
+        webgl=df["Equipo"].nunique() > EQUIPOS_MODO_DETALLE,
+        equipos=bloques_de_equipos(df)[0],
+    )
+    return [gantt, procesado.resumen.fig_pie, procesado.resumen.fig_pie_estado]
+
+
+def medir_pipeline(contenido, formato, fecha):
+    cronometro = Cronometro(medir_memoria=False)
+    df = leer_bitacora(contenido, fecha, f"bitacora.{formato}", cronometro)
+    tiempos = {registro["etapa"]: registro["segundos"] for registro in cronometro.etapas}
+
+    t = time.perf_counter()
+    procesado = procesar_turno(df)
+    _resumen(procesado)
+    tiempos["aggregate"] = time.perf_counter() - t
+
+    t = time.perf_counter()
+    figuras = _figuras(procesado)
+    tiempos["figure"] = time.perf_counter() - t
+
+    t = time.perf_counter()
+    bytes_json = sum(len(fig.to_json()) for fig in figuras)
+    tiempos["serialize"] = time.perf_counter() - t
+
+    return tiempos, len(df), bytes_json
+
+
+def version_codigo():
+    try:
+        return subprocess.run(
+            ["git", "describe", "--always", "--dirty"],
+            capture_output=True, text=True, check=True,
+            cwd=Path(__file__).parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def ejecutar(equipos, turnos, formato="xlsx", repeticiones=3, semilla=0):
+    version = version_codigo()
+    momento = datetime.now().isoformat(timespec="seconds")
+    filas = []
+
+    for n_equipos, n_turnos in itertools.product(equipos, turnos):
+        contenido = serializar(generar_bitacora(n_equipos, n_turnos, semilla), formato)
+
+        medidas = [
+            medir_pipeline(contenido, formato, datetime(2026, 1, 1).date())
+            for _ in range(repeticiones)
+        ]
+        _, n_filas, bytes_json = medidas[0]
+
+        for etapa in ETAPAS + ["total"]:
+            valores = [
+                sum(m[0].values()) if etapa == "total" else m[0][etapa]
+                for m in medidas
+            ]
+            filas.append({
+                "Version": version,
+                "Fecha": momento,
+                "Formato": formato,
+                "Equipos": n_equipos,
+                "Turnos": n_turnos,
+                "Filas": n_filas,
+                "Bytes archivo": len(contenido),
+                "Bytes JSON": bytes_json,
+                "Etapa": etapa,
+                "Mediana (s)": statistics.median(valores),
+                "Minimo (s)": min(valores),
+                "Repeticiones": repeticiones,
+            })
+
+        total = filas[-1]
+        print(
+            f"{n_equipos:>4} equipos x {n_turnos:>2} turnos: {n_filas:>7} filas, "
+            f"{total['Mediana (s)']:.3f} s",
+            file=sys.stderr,
+        )
+
+    return pd.DataFrame(filas)
+
+
+def leer_tabla(ruta):
+    formato = Path(ruta).suffix.lower()
+    if formato == ".parquet":
+        return pd.read_parquet(ruta)
+    if formato == ".xlsx":
+        return pd.read_excel(ruta)
+    return pd.read_csv(ruta)
+
+
+def comparar(actual, anterior):
+    claves = ["Formato", "Equipos", "Turnos", "Etapa"]
+    tabla = actual.merge(
+        anterior[claves + ["Mediana (s)"]], on=claves, suffixes=("", " anterior")
+    )
+    tabla["Relacion"] = tabla["Mediana (s)"] / tabla["Mediana (s) anterior"]
+    return tabla[claves + ["Mediana (s) anterior", "Mediana (s)", "Relacion"]]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Mide por etapa (parse, normalize, aggregate, figure, "
+                    "serialize) el pipeline del tablero con bitácoras sintéticas."
+    )
+    parser.add_argument("-e", "--equipos", type=int, nargs="+", default=[10, 50, 100, 500],
+                        help="cantidades de equipos a probar")
+    parser.add_argument("-t", "--turnos", type=int, nargs="+", default=[1, 30],
+                        help="cantidades de turnos por bitácora")
+    parser.add_argument("-f", "--formato", choices=FORMATOS_SOPORTADOS, default="xlsx")
+    parser.add_argument("-r", "--repeticiones", type=int, default=3)
+    parser.add_argument("-o", "--salida", default="benchmark.csv",
+                        help="archivo de resultados (.csv, .xlsx o .parquet)")
+    parser.add_argument("--comparar", metavar="RESULTADOS",
+                        help="resultados de otra versión para comparar medianas")
+    args = parser.parse_args(argv)
+
+    resultados = ejecutar(args.equipos, args.turnos, args.formato, args.repeticiones)
+    escribir_tabla(resultados, args.salida)
+    print(f"{len(resultados)} filas -> {args.salida}")
+
+    if args.comparar:
+        print(comparar(resultados, leer_tabla(args.comparar)).to_string(index=False))
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
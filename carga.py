@@ -0,0 +1,368 @@
+import hashlib
+import io
+import os
+import threading
+import unicodedata
+from collections import OrderedDict
+from datetime import datetime, time, date
+from numbers import Number
+
+import numpy as np
+import pandas as pd
+
+from diagnostico import etapa
+
+COLUMNAS_REQUERIDAS = ["Equipo", "Hora Inicio", "Hora Fin", "Descripcion", "Estado"]
+COLUMNAS_USADAS = COLUMNAS_REQUERIDAS + ["Ubicacion", "Categoria"]
+
+# Columnas de texto que se guardan como categóricas (códigos enteros
+# pequeños + una sola copia de cada valor distinto)
+COLUMNAS_CATEGORICAS = ["Equipo", "Estado", "Descripcion", "Ubicacion", "Categoria"]
+
+FORMATOS_SOPORTADOS = ["xlsx", "csv", "parquet", "arrow", "feather"]
+
+# Origen de los seriales de fecha de Excel (sistema 1900)
+EPOCA_EXCEL = pd.Timestamp("1899-12-30")
+
+PATRON_SOLO_HORA = r"^\s*\d{1,2}:\d{2}(:\d{2}(\.\d+)?)?\s*$"
+
+# Una hora suelta que retrocede más que esto respecto de la fila anterior
+# del mismo equipo ya es del día siguiente (turno que cruza la medianoche)
+RETROCESO_MEDIANOCHE = pd.Timedelta(hours=12)
+
+
+class ArchivoInvalido(ValueError):
+    pass
+
+
+def convertir_hora(x):
+    if isinstance(x, time):
+        return datetime.combine(date.today(), x)
+    try:
+        return pd.to_datetime(x)
+    except:
+        return None
+
+
+def _grupo_de_tipo(tipo):
+    if tipo is time:
+        return "hora"
+    if issubclass(tipo, (datetime, np.datetime64)):
+        return "fecha"
+    if issubclass(tipo, str):
+        return "texto"
+    if issubclass(tipo, Number) and not issubclass(tipo, bool):
+        return "numero"
+    return "otro"
+
+
+# Horas sueltas -> fecha y hora, todas en la fecha de operación; el paso
+# de la medianoche se corrige después con los datos (cruzar_medianoche)
+def anclar_horas(horas_del_dia, ancla):
+    return ancla + pd.to_timedelta(horas_del_dia)
+
+
+# =====================================================
+# NORMALIZACION VECTORIZADA DE HORAS
+# =====================================================
+# Equivalente columnar de convertir_hora: agrupa las celdas por tipo
+# (time, datetime, texto, serial numérico de Excel) y convierte cada grupo
+# de una sola vez. Las horas sueltas se anclan a la fecha de operación
+# `fecha`; _normalizar_horas devuelve además qué celdas eran horas sueltas.
+def normalizar_horas(serie, fecha=None):
+    return _normalizar_horas(serie, fecha)[0]
+
+
+def _normalizar_horas(serie, fecha=None):
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        return serie, np.zeros(len(serie), dtype=bool)
+
+    ancla = pd.Timestamp(fecha or date.today())
+    resultado = pd.Series(pd.NaT, index=serie.index, dtype="datetime64[ns]")
+
+    valores = serie.to_numpy(dtype=object)
+    tipos = serie.map(type)
+    grupos = tipos.map({t: _grupo_de_tipo(t) for t in tipos.unique()})
+    grupos = grupos.where(~pd.isna(serie), "nulo").to_numpy()
+
+    es_hora = grupos == "hora"
+    es_fecha = grupos == "fecha"
+    es_texto = grupos == "texto"
+    es_numero = grupos == "numero"
+    otros = grupos == "otro"
+    sueltas = es_hora.copy()
+
+    if es_hora.any():
+        micros = np.fromiter(
+            (
+                ((v.hour * 60 + v.minute) * 60 + v.second) * 1_000_000 + v.microsecond
+                for v in valores[es_hora]
+            ),
+            dtype="int64",
+            count=int(es_hora.sum()),
+        )
+        resultado[es_hora] = anclar_horas(pd.to_timedelta(micros, unit="us"), ancla)
+
+    if es_fecha.any():
+        resultado[es_fecha] = pd.to_datetime(valores[es_fecha])
+
+    if es_texto.any():
+        textos = serie[es_texto].astype(str)
+        solo_hora = textos.str.match(PATRON_SOLO_HORA)
+
+        if solo_hora.any():
+            horas = textos[solo_hora].str.strip()
+            horas = horas.where(horas.str.count(":") == 2, horas + ":00")
+            resultado[solo_hora[solo_hora].index] = (
+                anclar_horas(pd.to_timedelta(horas, errors="coerce"), ancla)
+            ).to_numpy()
+            sueltas[es_texto] = solo_hora.to_numpy()
+
+        resto = textos[~solo_hora]
+        if len(resto):
+            resultado[resto.index] = pd.to_datetime(
+                resto, format="mixed", errors="coerce"
+            ).to_numpy()
+
+    if es_numero.any():
+        dias = valores[es_numero].astype("float64")
+        solo_hora = dias < 1
+        convertidos = pd.to_timedelta(dias, unit="D") + EPOCA_EXCEL
+        convertidos = convertidos.where(
+            ~solo_hora, anclar_horas(pd.to_timedelta(dias, unit="D"), ancla)
+        )
+        resultado[es_numero] = convertidos
+        sueltas[es_numero] = solo_hora
+
+    if otros.any():
+        resultado[otros] = pd.to_datetime(
+            [convertir_hora(v) for v in valores[otros]], errors="coerce"
+        )
+
+    return resultado, sueltas
+
+
+# Turnos que cruzan la medianoche con horas sueltas: en la secuencia de
+# cada equipo (orden del archivo, inicio y fin de cada fila) una hora que
+# retrocede respecto de la anterior pasa al día siguiente, y con ella las
+# que siguen. Un fin anterior al inicio de su misma fila siempre cruza
+# (19:00 -> 07:00); entre filas distintas, solo si retrocede más de
+# RETROCESO_MEDIANOCHE. La primera hora suelta del archivo abre la
+# secuencia de todos los equipos, así un equipo que aparece recién pasada
+# la medianoche también cambia de día.
+def cruzar_medianoche(equipos, inicio, fin, sueltas_inicio, sueltas_fin):
+    n = len(inicio)
+    horas = pd.Series(np.column_stack([
+        inicio.where(sueltas_inicio).to_numpy(),
+        fin.where(sueltas_fin).to_numpy(),
+    ]).ravel())
+    validas = horas.notna().to_numpy()
+    if not validas.any():
+        return inicio, fin
+
+    # Fin cuyo anterior en la secuencia es el inicio de su propia fila
+    misma_fila = np.zeros(2 * n, dtype=bool)
+    misma_fila[1::2] = validas[0::2] & validas[1::2]
+
+    grupo = np.repeat(pd.factorize(equipos)[0], 2)[validas]
+    horas = horas[validas]
+    anterior = horas.groupby(grupo).shift().fillna(horas.iloc[0])
+    umbral = np.where(misma_fila[validas], pd.Timedelta(0), RETROCESO_MEDIANOCHE)
+    saltos = ((anterior - horas) > umbral).groupby(grupo).cumsum()
+
+    dias = np.zeros(2 * n, dtype="int64")
+    dias[validas] = saltos.to_numpy()
+    dias = dias.reshape(n, 2)
+    return (
+        inicio + pd.to_timedelta(dias[:, 0], unit="D").to_numpy(),
+        fin + pd.to_timedelta(dias[:, 1], unit="D").to_numpy(),
+    )
+
+
+# =====================================================
+# DESCRIPCIONES NORMALIZADAS
+# =====================================================
+# Las descripciones se escriben a mano en despacho: "CAMBIO DE BROCA",
+# "Cambio de broca." y "cambio  de  broca" son la misma demora. Se
+# normalizan una vez por categoría al leer la bitácora, así tablero,
+# cubo e histórico agrupan por el mismo texto. Solo se limpian espacios
+# y puntuación de los bordes; mayúsculas y tildes se respetan.
+def forma_canonica(texto):
+    return " ".join(str(texto).split()).strip(" .,;:-")
+
+
+# Clave para comparar textos sin mayúsculas ni tildes
+def clave_texto(texto):
+    sin_tildes = unicodedata.normalize("NFKD", texto).encode("ascii", "ignore").decode()
+    return sin_tildes.casefold()
+
+
+def normalizar_descripciones(serie):
+    if not len(serie.cat.categories):
+        return serie
+
+    formas = [forma_canonica(c) for c in serie.cat.categories]
+    filas = serie.cat.codes.value_counts().reindex(range(len(formas)), fill_value=0)
+
+    usos = {}
+    for forma, n in zip(formas, filas):
+        if forma:
+            usos[forma] = usos.get(forma, 0) + n
+
+    # Entre variantes con la misma clave queda la más usada en la
+    # bitácora; en empate, la que tiene tildes
+    elegida = {}
+    for forma, n in usos.items():
+        clave = clave_texto(forma)
+        puntaje = (n, sum(not c.isascii() for c in forma))
+        if clave not in elegida or puntaje > elegida[clave][1]:
+            elegida[clave] = (forma, puntaje)
+
+    nuevas = [elegida[clave_texto(f)][0] if f else None for f in formas]
+    codigos_nuevos, unicas = pd.factorize(pd.Index(nuevas, dtype=object))
+
+    codigos = serie.cat.codes.to_numpy()
+    codigos = np.where(codigos >= 0, codigos_nuevos[codigos], -1)
+    return pd.Series(
+        pd.Categorical.from_codes(codigos, categories=unicas), index=serie.index, name=serie.name
+    )
+
+
+# =====================================================
+# ESQUEMA COMPACTO DE INTERVALOS
+# =====================================================
+# Texto como categóricas y duración como segundos enteros (Int32, nulo
+# cuando alguna de las horas no se pudo convertir).
+def aplicar_esquema(df):
+    for col in COLUMNAS_CATEGORICAS:
+        if col in df.columns:
+            df[col] = df[col].astype("category")
+
+    if "Descripcion" in df.columns:
+        df["Descripcion"] = normalizar_descripciones(df["Descripcion"])
+
+    segundos = (df["Hora Fin"] - df["Hora Inicio"]).dt.total_seconds()
+    df["Segundos"] = segundos.round().astype("Int32")
+
+    return df
+
+
+# =====================================================
+# LECTURA Y NORMALIZACION DE LA BITACORA
+# =====================================================
+def _leer_xlsx(buffer):
+    # Solo las columnas usadas (pandas ya abre openpyxl en read_only)
+    return pd.read_excel(
+        buffer,
+        engine="openpyxl",
+        usecols=lambda c: c in COLUMNAS_USADAS,
+    )
+
+
+def _leer_csv(buffer):
+    return pd.read_csv(buffer, usecols=lambda c: c in COLUMNAS_USADAS)
+
+
+def _leer_parquet(buffer):
+    import pyarrow.parquet as pq
+
+    archivo = pq.ParquetFile(buffer)
+    columnas = [c for c in archivo.schema_arrow.names if c in COLUMNAS_USADAS]
+    return archivo.read(columns=columnas).to_pandas()
+
+
+def _leer_arrow(buffer):
+    import pyarrow.feather as feather
+
+    tabla = feather.read_table(buffer)
+    columnas = [c for c in tabla.column_names if c in COLUMNAS_USADAS]
+    return tabla.select(columnas).to_pandas()
+
+
+LECTORES = {
+    "xlsx": _leer_xlsx,
+    "csv": _leer_csv,
+    "parquet": _leer_parquet,
+    "arrow": _leer_arrow,
+    "feather": _leer_arrow,
+}
+
+
+def formato_de(nombre):
+    return os.path.splitext(str(nombre))[1].lstrip(".").lower() or "xlsx"
+
+
+def leer_bitacora(contenido, fecha=None, nombre="bitacora.xlsx", cronometro=None):
+    formato = formato_de(nombre)
+    if formato not in LECTORES:
+        raise ArchivoInvalido(
+            f"Formato no soportado: .{formato} (use {', '.join(FORMATOS_SOPORTADOS)})"
+        )
+
+    with etapa(cronometro, "parse", formato=formato, bytes_archivo=len(contenido)) as registro:
+        df = LECTORES[formato](io.BytesIO(contenido))
+        registro["filas"] = len(df)
+
+    if not all(col in df.columns for col in COLUMNAS_REQUERIDAS):
+        raise ArchivoInvalido(
+            "El archivo debe contener: " + ", ".join(COLUMNAS_REQUERIDAS)
+        )
+
+    with etapa(cronometro, "normalize", filas=len(df)):
+        inicio, sueltas_inicio = _normalizar_horas(df["Hora Inicio"], fecha)
+        fin, sueltas_fin = _normalizar_horas(df["Hora Fin"], fecha)
+        df["Hora Inicio"], df["Hora Fin"] = cruzar_medianoche(
+            df["Equipo"], inicio, fin, sueltas_inicio, sueltas_fin
+        )
+        df = aplicar_esquema(df)
+
+    return df
+
+
+def hash_contenido(contenido):
+    return hashlib.sha256(contenido).hexdigest()
+
+
+# =====================================================
+# CACHE DE BITACORAS (LRU POR HASH DEL ARCHIVO)
+# =====================================================
+# La clave incluye la fecha de anclaje de las horas sueltas para no servir
+# un turno anclado a otro día.
+class CacheBitacoras:
+    def __init__(self, max_entradas=8):
+        self.max_entradas = max_entradas
+        self.hits = 0
+        self.misses = 0
+        self._entradas = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entradas)
+
+    def obtener(self, contenido, nombre="bitacora.xlsx", cargar=leer_bitacora,
+                fecha=None):
+        fecha = fecha or date.today()
+        clave = (hash_contenido(contenido), formato_de(nombre), fecha)
+
+        with self._lock:
+            if clave in self._entradas:
+                self._entradas.move_to_end(clave)
+                self.hits += 1
+                return self._entradas[clave].copy()
+
+        df = cargar(contenido, fecha, nombre)
+
+        with self._lock:
+            self.misses += 1
+            self._entradas[clave] = df
+            self._entradas.move_to_end(clave)
+            while len(self._entradas) > self.max_entradas:
+                self._entradas.popitem(last=False)
+
+        return df.copy()
+
+    def limpiar(self):
+        with self._lock:
+            self._entradas.clear()
+            self.hits = 0
+            self.misses = 0
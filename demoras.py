@@ -0,0 +1,148 @@
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+from carga import clave_texto
+from equipos import tajo_de_filas
+
+# Hora de inicio de cada turno (misma regla que calcular_turno)
+HORA_INICIO_TURNO = {"T/D": 7, "T/N": 19}
+HORAS_TURNO = 12
+
+DIMENSIONES_DEMORAS = ["Clave", "Descripcion", "Equipo", "Tajo", "Ubicacion", "Hora"]
+
+AGRUPACIONES_PARETO = {
+    "Descripcion": "Tipo de demora",
+    "Equipo": "Equipo",
+    "Tajo": "Tajo",
+    "Hora": "Hora del turno",
+}
+
+UMBRAL_PARETO = 80
+
+
+# =====================================================
+# ROLLUP DE DEMORAS POR TURNO
+# =====================================================
+# Minutos y número de demoras por (descripción, equipo, ubicación, hora
+# del turno). Un intervalo que cruza horas se reparte entre ellas; cuenta
+# como evento solo en la hora en que empieza. Es lo que se guarda en el
+# histórico: los Pareto de muchos turnos salen de aquí, sin releer
+# bitácoras.
+def rollup_demoras(df, fecha, turno):
+    demoras = df[
+        (df["Estado"] == "Demora")
+        & df["Hora Inicio"].notna()
+        & (df["Hora Fin"] > df["Hora Inicio"])
+    ]
+    inicio_turno = pd.Timestamp(fecha).normalize() + timedelta(hours=HORA_INICIO_TURNO[turno])
+
+    desde = ((demoras["Hora Inicio"] - inicio_turno) / timedelta(hours=1)).to_numpy(dtype="float64")
+    hasta = ((demoras["Hora Fin"] - inicio_turno) / timedelta(hours=1)).to_numpy(dtype="float64")
+    primera = np.floor(desde).astype("int64")
+    partes = np.ceil(hasta).astype("int64") - primera
+
+    fila = np.repeat(np.arange(len(demoras)), partes)
+    hora = primera[fila] + np.arange(len(fila)) - np.repeat(np.cumsum(partes) - partes, partes)
+    segundos = (np.minimum(hasta[fila], hora + 1) - np.maximum(desde[fila], hora)) * 3600
+
+    rollup = demoras[["Descripcion", "Equipo", "Ubicacion"]].iloc[fila].reset_index(drop=True)
+    rollup["Hora"] = np.clip(hora, 0, HORAS_TURNO - 1)
+    rollup["Segundos"] = segundos
+    rollup["Eventos"] = (hora == primera[fila]).astype("int64")
+
+    descripciones = rollup["Descripcion"].astype("category").cat.categories
+    rollup["Clave"] = rollup["Descripcion"].map(
+        dict(zip(descripciones, [clave_texto(d) for d in descripciones]))
+    )
+    rollup["Tajo"] = tajo_de_filas(rollup)
+
+    return (
+        rollup.astype({"Clave": object, "Descripcion": object, "Equipo": object,
+                       "Ubicacion": object, "Tajo": object})
+        .groupby(DIMENSIONES_DEMORAS, dropna=False, sort=False)[["Segundos", "Eventos"]]
+        .sum()
+        .reset_index()
+    )
+
+
+# =====================================================
+# PARETO Y TOP N
+# =====================================================
+def filtrar_demoras(rollup, equipos=None, tajos=None):
+    if equipos:
+        rollup = rollup[rollup["Equipo"].isin(equipos)]
+    if tajos:
+        rollup = rollup[rollup["Tajo"].isin(tajos)]
+    return rollup
+
+
+# Minutos, eventos, porcentaje y porcentaje acumulado por la agrupación
+# pedida, de mayor a menor. Las descripciones se agrupan por su clave
+# (sin mayúsculas ni tildes) y se muestran con su forma más usada.
+def pareto(rollup, por="Descripcion", n=None):
+    clave = "Clave" if por == "Descripcion" else por
+    grupos = rollup.dropna(subset=[clave]).groupby(clave)
+
+    tabla = pd.DataFrame({
+        "Minutos": grupos["Segundos"].sum() / 60,
+        "Eventos": grupos["Eventos"].sum(),
+    })
+    if por == "Descripcion":
+        formas = rollup.groupby(["Clave", "Descripcion"])["Segundos"].sum().sort_values()
+        mas_usada = (
+            formas.reset_index().drop_duplicates("Clave", keep="last").set_index("Clave")
+        )
+        tabla.index = mas_usada["Descripcion"].reindex(tabla.index)
+    elif por == "Hora":
+        # Horas del turno numeradas desde 1 para mostrarlas
+        tabla.index = tabla.index + 1
+
+    tabla = tabla.sort_values("Minutos", ascending=False)
+    tabla["%"] = tabla["Minutos"] / tabla["Minutos"].sum() * 100
+    tabla["% acumulado"] = tabla["%"].cumsum()
+    if n:
+        tabla = tabla.head(n)
+
+    return tabla.rename_axis(por).reset_index()
+
+
+def figura_pareto(tabla, por="Descripcion"):
+    etiquetas = tabla[por].astype(str)
+    if por == "Hora":
+        etiquetas = "Hora " + etiquetas
+
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        x=etiquetas,
+        y=tabla["Minutos"],
+        marker_color="#FFC000",
+        name="Minutos",
+        customdata=tabla[["Eventos", "%"]],
+        hovertemplate="<b>%{x}</b><br>%{y:.0f} min · %{customdata[0]} eventos"
+                      "<br>%{customdata[1]:.1f}%<extra></extra>",
+    ))
+    fig.add_trace(go.Scatter(
+        x=etiquetas,
+        y=tabla["% acumulado"],
+        yaxis="y2",
+        mode="lines+markers",
+        line=dict(color="black"),
+        name="% acumulado",
+        hovertemplate="%{y:.1f}%<extra></extra>",
+    ))
+    fig.add_hline(y=UMBRAL_PARETO, yref="y2", line_dash="dash", line_color="#FF0000")
+
+    fig.update_layout(
+        paper_bgcolor="white",
+        plot_bgcolor="white",
+        font=dict(color="black"),
+        xaxis=dict(title=AGRUPACIONES_PARETO[por], type="category"),
+        yaxis=dict(title="Minutos"),
+        yaxis2=dict(title="% acumulado", overlaying="y", side="right", range=[0, 105]),
+        legend=dict(orientation="h", y=1.1, bgcolor="rgba(0,0,0,0)"),
+        margin=dict(t=40),
+    )
+    return fig
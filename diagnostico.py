@@ -0,0 +1,116 @@
+import json
+import os
+import threading
+import time
+import tracemalloc
+import weakref
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+
+import pandas as pd
+
+RUTA_LOG_DIAGNOSTICO = os.environ.get("DIAGNOSTICO_LOG", "diagnostico.jsonl")
+
+COLUMNAS_TABLA = ["etapa", "segundos", "memoria_pico_mb", "filas", "bytes_json"]
+
+_lock_log = threading.Lock()
+
+# tracemalloc es de todo el proceso: se enciende con el primer cronómetro
+# que mide memoria y se apaga con el último. La medición de etapas es de
+# a una por vez (reset_peak borraría el pico de otra sesión); una etapa
+# que se superpone con otra en curso no mide memoria.
+_lock_memoria = threading.Lock()
+_lock_etapa_memoria = threading.Lock()
+_usuarios_memoria = 0
+_memoria_externa = False
+
+
+def _encender_memoria():
+    global _usuarios_memoria, _memoria_externa
+    with _lock_memoria:
+        if _usuarios_memoria == 0:
+            _memoria_externa = tracemalloc.is_tracing()
+            if not _memoria_externa:
+                tracemalloc.start()
+        _usuarios_memoria += 1
+
+
+def _apagar_memoria():
+    global _usuarios_memoria
+    with _lock_memoria:
+        _usuarios_memoria -= 1
+        if _usuarios_memoria == 0 and not _memoria_externa and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+
+# =====================================================
+# CRONOMETRO POR ETAPA
+# =====================================================
+# Tiempo, memoria pico (tracemalloc) y datos libres (filas, bytes del
+# JSON de la figura...) de cada etapa de una ejecución del tablero. Solo
+# se crea cuando el diagnóstico está activo: tracemalloc encarece todas
+# las asignaciones mientras está encendido.
+class Cronometro:
+    def __init__(self, medir_memoria=True):
+        self.etapas = []
+        self._inicio = time.perf_counter()
+        self._medir_memoria = medir_memoria
+        if medir_memoria:
+            _encender_memoria()
+            # Si la ejecución se corta antes de cerrar (st.stop), al liberarse
+            self._apagar = weakref.finalize(self, _apagar_memoria)
+
+    @contextmanager
+    def etapa(self, nombre, **datos):
+        registro = {"etapa": nombre, **datos}
+        medir_memoria = (
+            self._medir_memoria
+            and tracemalloc.is_tracing()
+            and _lock_etapa_memoria.acquire(blocking=False)
+        )
+        if medir_memoria:
+            tracemalloc.reset_peak()
+            memoria_base = tracemalloc.get_traced_memory()[0]
+
+        t = time.perf_counter()
+        try:
+            yield registro
+        finally:
+            registro["segundos"] = time.perf_counter() - t
+            if medir_memoria:
+                registro["memoria_pico_mb"] = (
+                    tracemalloc.get_traced_memory()[1] - memoria_base
+                ) / 2**20
+                _lock_etapa_memoria.release()
+            self.etapas.append(registro)
+
+    def cerrar(self):
+        if self._medir_memoria:
+            self._medir_memoria = False
+            self._apagar()
+        return time.perf_counter() - self._inicio
+
+    def tabla(self):
+        tabla = pd.DataFrame(self.etapas)
+        primeras = [c for c in COLUMNAS_TABLA if c in tabla.columns]
+        return tabla[primeras + [c for c in tabla.columns if c not in primeras]]
+
+    def escribir_log(self, ruta=RUTA_LOG_DIAGNOSTICO, **contexto):
+        linea = json.dumps(
+            {
+                "momento": datetime.now().isoformat(timespec="seconds"),
+                **contexto,
+                "etapas": self.etapas,
+            },
+            ensure_ascii=False,
+            default=str,
+        )
+        with _lock_log, open(ruta, "a", encoding="utf-8") as f:
+            f.write(linea + "\n")
+
+
+# Para instrumentar código que corre con o sin diagnóstico
+def etapa(cronometro, nombre, **datos):
+    if cronometro is None:
+        return nullcontext({})
+    return cronometro.etapa(nombre, **datos)
@@ -0,0 +1,210 @@
+import threading
+
+import pandas as pd
+
+from kpis import calcular_metraje, metros_por_tipo
+from tablero import metros_proyectados, tabla_estado_actual
+
+COLUMNAS_EVENTO = [
+    "Equipo", "Hora Inicio", "Hora Fin", "Estado", "Categoria", "Ubicacion", "Segundos",
+]
+
+
+def _segundos(evento):
+    segundos = evento.get("Segundos")
+    if not pd.isna(segundos):
+        return float(segundos)
+    inicio, fin = evento.get("Hora Inicio"), evento.get("Hora Fin")
+    if pd.isna(inicio) or pd.isna(fin):
+        return 0.0
+    return (fin - inicio).total_seconds()
+
+
+# Total por clave: [segundos, intervalos]; la clave se quita cuando ya no
+# le queda ningún intervalo
+def _sumar(totales, clave, segundos, intervalos):
+    total = totales.setdefault(clave, [0.0, 0])
+    total[0] += segundos
+    total[1] += intervalos
+    if total[1] == 0:
+        del totales[clave]
+
+
+# =====================================================
+# ESTADO ACTUAL EN VIVO
+# =====================================================
+# Recibe los intervalos de a uno (de un generador, una cola o las filas
+# nuevas de una recarga incremental) y mantiene, por equipo, su último
+# intervalo, los segundos por Estado y por Categoria y los segundos
+# operativos. Un intervalo se identifica por (Equipo, Hora Inicio): si
+# llega de nuevo (reenviado, o abierto y con un fin más tarde) reemplaza
+# lo que aportaba antes. Cada evento cuesta O(1); las tablas del tablero
+# se arman con una fila por equipo, sin volver a recorrer el turno.
+class EstadoEnVivo:
+    def __init__(self):
+        self.eventos = 0
+        self._ultimo = {}
+        self._aportes = {}
+        self._por_estado = {}
+        self._por_categoria = {}
+        self._lock = threading.Lock()
+
+    # Estado inicial desde una bitácora completa, en una sola pasada
+    # columnar (mismo resultado que consumir(eventos_de(df)))
+    @classmethod
+    def desde(cls, df):
+        estado = cls()
+        orden = _orden_de_llegada(df)
+        con_inicio = orden["Hora Inicio"].notna()
+        orden = orden[~(con_inicio & orden.duplicated(["Equipo", "Hora Inicio"], keep="last"))]
+
+        segundos = orden["Segundos"].astype("float64").fillna(
+            (orden["Hora Fin"] - orden["Hora Inicio"]).dt.total_seconds()
+        ).fillna(0.0)
+        equipos = orden["Equipo"].astype(object)
+
+        columnas = {c: orden[c].astype(object) for c in ["Estado", "Categoria", "Ubicacion"]}
+
+        for nivel, totales in (("Estado", estado._por_estado), ("Categoria", estado._por_categoria)):
+            grupos = segundos.groupby([equipos, columnas[nivel]]).agg(["sum", "size"])
+            for clave, (total, intervalos) in zip(grupos.index, grupos.itertuples(index=False)):
+                totales[clave] = [total, intervalos]
+
+        ultimos = equipos.groupby(equipos, sort=False).tail(1).index
+        estado._ultimo = dict(zip(
+            equipos[ultimos],
+            zip(orden.loc[ultimos, "Hora Fin"].astype(object),
+                columnas["Estado"][ultimos], columnas["Ubicacion"][ultimos]),
+        ))
+
+        validos = con_inicio[orden.index]
+        estado._aportes = dict(zip(
+            zip(equipos[validos].tolist(), _marcas(orden.loc[validos, "Hora Inicio"])),
+            zip(columnas["Estado"][validos].tolist(), columnas["Categoria"][validos].tolist(),
+                segundos[validos].tolist()),
+        ))
+        estado.eventos = len(df)
+        return estado
+
+    def _aportar(self, equipo, estado, categoria, segundos, signo):
+        # Igual que en el cubo, los intervalos sin Estado o sin
+        # Categoria no suman a sus totales
+        if not pd.isna(estado):
+            _sumar(self._por_estado, (equipo, estado), signo * segundos, signo)
+        if not pd.isna(categoria):
+            _sumar(self._por_categoria, (equipo, categoria), signo * segundos, signo)
+
+    def registrar(self, evento):
+        equipo = evento["Equipo"]
+        inicio = evento.get("Hora Inicio")
+        estado = evento.get("Estado")
+        categoria = evento.get("Categoria")
+        fin = evento.get("Hora Fin")
+        segundos = _segundos(evento)
+
+        with self._lock:
+            self.eventos += 1
+
+            # El más reciente por Hora Fin; en empate, el último que llegó.
+            # Un intervalo sin fin solo cuenta si el equipo no tenía otro.
+            anterior = self._ultimo.get(equipo)
+            if anterior is None or (not pd.isna(fin) and not (fin < anterior[0])):
+                self._ultimo[equipo] = (fin, estado, evento.get("Ubicacion"))
+
+            if not pd.isna(inicio):
+                clave = (equipo, pd.Timestamp(inicio).value)
+                previo = self._aportes.pop(clave, None)
+                if previo is not None:
+                    self._aportar(equipo, *previo, signo=-1)
+                self._aportes[clave] = (estado, categoria, segundos)
+            self._aportar(equipo, estado, categoria, segundos, signo=1)
+
+    def consumir(self, eventos):
+        for evento in eventos:
+            self.registrar(evento)
+        return self
+
+    # ------------------------------------------------
+    # Vistas (una fila por equipo o por par equipo/clave)
+    # ------------------------------------------------
+    def _serie(self, totales, nivel):
+        with self._lock:
+            totales = {clave: total[0] for clave, total in totales.items()}
+        if not totales:
+            return pd.Series(
+                dtype="float64",
+                index=pd.MultiIndex.from_tuples([], names=["Equipo", nivel]),
+            )
+        return pd.Series(totales).rename_axis(["Equipo", nivel]).sort_index()
+
+    def segundos_por_estado(self):
+        return self._serie(self._por_estado, "Estado")
+
+    def segundos_por_categoria(self):
+        return self._serie(self._por_categoria, "Categoria")
+
+    def segundos_operativos(self):
+        por_estado = self.segundos_por_estado()
+        operativo = por_estado[por_estado.index.get_level_values("Estado") == "Operativo"]
+        return operativo.droplevel("Estado").rename_axis("Equipo")
+
+    def segundos_totales(self):
+        return self.segundos_por_estado().groupby(level="Equipo").sum()
+
+    # Segundos operativos / segundos con Estado, como en kpis_por_equipo
+    def operatividad(self):
+        totales = self.segundos_totales()
+        operativos = self.segundos_operativos().reindex(totales.index).fillna(0)
+        return (operativos / totales).rename("Operatividad")
+
+    def estado_actual(self):
+        with self._lock:
+            ultimo = dict(self._ultimo)
+        return pd.DataFrame(
+            [(equipo, estado, ubicacion) for equipo, (_, estado, ubicacion) in ultimo.items()],
+            columns=["Equipo", "Estado", "Ubicación / Frente"],
+        )
+
+    # Misma tabla y mismos números que ResumenTurno, desde los totales
+    @property
+    def df_resumen(self):
+        return tabla_estado_actual(self.estado_actual(), self.segundos_operativos())
+
+    def metros_acumulados(self):
+        return metros_por_tipo(calcular_metraje(self.segundos_operativos() / 3600))
+
+    def metros_proyectados(self):
+        return metros_proyectados(self.segundos_totales(), self.segundos_operativos())
+
+    # Lo que ResumenTurno toma del motor, calculado ahora: el motor sigue
+    # recibiendo eventos y el resumen de un turno ya procesado no cambia
+    def vistas(self):
+        return {
+            "df_resumen": self.df_resumen,
+            "metros_acumulados": self.metros_acumulados(),
+            "metros_proyectados": self.metros_proyectados(),
+        }
+
+
+# Horas como enteros (ns): claves de intervalo baratas de comparar
+def _marcas(horas):
+    return horas.to_numpy(dtype="datetime64[ns]").view("int64").tolist()
+
+
+def _orden_de_llegada(df):
+    return df.sort_values("Hora Fin", kind="stable", na_position="first")
+
+
+# Eventos de una bitácora ya leída, en el orden en que se registraron
+def eventos_de(df):
+    columnas = [c for c in COLUMNAS_EVENTO if c in df.columns]
+    return iter(_orden_de_llegada(df)[columnas].astype(object).to_dict("records"))
+
+
+# Eventos que otro hilo deja en una cola (queue.Queue), hasta recibir `fin`
+def eventos_de_cola(cola, fin=None):
+    while True:
+        evento = cola.get()
+        if evento is fin:
+            return
+        yield evento
@@ -0,0 +1,85 @@
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+CARPETA = Path(__file__).parent
+
+RUTA_EQUIPOS = os.environ.get("REGISTRO_EQUIPOS", CARPETA / "equipos.csv")
+RUTA_TAJOS = os.environ.get("REGISTRO_TAJOS", CARPETA / "tajos.csv")
+
+COLUMNAS_EQUIPOS = ["Equipo", "Tipo", "a", "b", "Eficiencia", "Tajo"]
+TIPOS_EQUIPO = ["DTH", "RTR"]
+
+# Equipos que no están en el registro: sin fórmula de metraje (0 m)
+TIPO_POR_DEFECTO = "DTH"
+
+
+class RegistroInvalido(ValueError):
+    pass
+
+
+# =====================================================
+# REGISTRO DE EQUIPOS
+# =====================================================
+# Un archivo con una fila por equipo (tipo, coeficientes de la fórmula
+# metros = a * eficiencia * horas + b, tajo por defecto). Se lee una vez por proceso
+# y queda indexado por Equipo, para cruzarlo con columnas enteras: sumar
+# equipos es editar el archivo, sin cambiar código.
+def leer_registro(ruta=RUTA_EQUIPOS):
+    registro = pd.read_csv(ruta, dtype={"Equipo": str, "Tipo": str, "Tajo": str})
+
+    faltantes = [c for c in COLUMNAS_EQUIPOS if c not in registro.columns]
+    if faltantes:
+        raise RegistroInvalido(f"{ruta}: faltan columnas {', '.join(faltantes)}")
+
+    registro["Equipo"] = registro["Equipo"].str.strip()
+    registro["Tipo"] = registro["Tipo"].str.strip().str.upper()
+    registro["Tajo"] = registro["Tajo"].str.strip()
+
+    repetidos = registro["Equipo"][registro["Equipo"].duplicated()].unique()
+    if len(repetidos):
+        raise RegistroInvalido(f"{ruta}: equipos repetidos {', '.join(repetidos)}")
+
+    otros = set(registro["Tipo"]) - set(TIPOS_EQUIPO)
+    if otros:
+        raise RegistroInvalido(f"{ruta}: tipos desconocidos {', '.join(sorted(otros))}")
+
+    registro["Eficiencia"] = registro["Eficiencia"].fillna(1.0)
+    registro["a_efectivo"] = registro["a"] * registro["Eficiencia"]
+
+    return registro.set_index("Equipo")
+
+
+# Color de cada tajo, para las etiquetas del Gantt según la ubicación
+def leer_tajos(ruta=RUTA_TAJOS):
+    tajos = pd.read_csv(ruta, dtype=str)
+    return dict(zip(tajos["Tajo"].str.strip(), tajos["Color"].str.strip()))
+
+
+# Tajo de cada ubicación: su primera palabra ("Ferrobamba Fase 5")
+def tajos_de(ubicaciones):
+    return pd.Index(ubicaciones).astype(str).str.strip().str.split().str[0]
+
+
+# Tajo de cada fila (categórica): el de su ubicación o, sin ubicación, el
+# del equipo en el registro. Se resuelve una vez por valor distinto y las
+# filas solo cruzan códigos.
+def tajo_de_filas(df):
+    ubicacion = df["Ubicacion"].astype("category")
+    equipo = df["Equipo"].astype("category")
+    por_ubicacion = tajos_de(ubicacion.cat.categories)
+    por_equipo = pd.Index(equipo.cat.categories.map(REGISTRO["Tajo"]))
+
+    tajos = por_ubicacion.append(por_equipo).dropna().unique()
+    codigo_ubicacion = np.append(tajos.get_indexer(por_ubicacion), -1)
+    codigo_equipo = np.append(tajos.get_indexer(por_equipo), -1)
+
+    codigos = codigo_ubicacion[ubicacion.cat.codes.to_numpy()]
+    codigos = np.where(codigos < 0, codigo_equipo[equipo.cat.codes.to_numpy()], codigos)
+    return pd.Series(pd.Categorical.from_codes(codigos, tajos), index=df.index)
+
+
+REGISTRO = leer_registro()
+COLORES_TAJO = leer_tajos()
@@ -0,0 +1,466 @@
+import base64
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+from datetime import timedelta
+from pathlib import Path
+
+from equipos import COLORES_TAJO, tajo_de_filas
+from kpis import tipo_equipo
+
+COLORES_ESTADO = {
+    "Operativo": "#00B050",
+    "Demora": "#FFC000",
+    "Stand By": "#00B0F0",
+    "Inoperativo":"#FF0000",
+}
+COLOR_SIN_ESTADO = "#95a5a6"
+
+# Flotas más grandes que esto se dibujan por defecto en modo WebGL,
+# paginadas en bloques de BLOQUE_EQUIPOS equipos.
+EQUIPOS_MODO_DETALLE = 20
+BLOQUE_EQUIPOS = 25
+
+ALTURA_FILA_DETALLE = 250
+ALTURA_FILA_MIN = 40
+ALTURA_GANTT_OBJETIVO = 6000
+
+CARPETA_STATIC = Path(__file__).parent / "static"
+ARCHIVOS_LOGOS = ("logo_owm.png", "logo_mmg.png")
+
+
+def load_image_base64(image_path):
+    with open(image_path, "rb") as f:
+        return "data:image/png;base64," + base64.b64encode(f.read()).decode()
+
+
+# Logos incrustados, para figuras que se ven fuera del servidor
+# (reportes exportados o la app sin servidor de estáticos)
+def logos_base64():
+    return tuple(load_image_base64(CARPETA_STATIC / nombre) for nombre in ARCHIVOS_LOGOS)
+
+
+def titulo_gantt(operacion):
+    return (
+        f"<b style='color:black; font-size:30px';font-size:10px;>"
+        f"ESTADO DE EQUIPOS - OPERACIÓN {operacion}"
+        f"</b>"
+    )
+
+
+# =====================================================
+# ETIQUETAS Y TEXTOS DERIVADOS
+# =====================================================
+# Se calculan una vez por valor distinto (equipo/ubicación, duración) y
+# se expanden a las filas como categóricas, sin guardar un string por fila.
+def _categorica_desde_pares(codigos, textos):
+    codigos_texto, unicos = pd.factorize(pd.Index(textos, dtype=object))
+    return pd.Categorical.from_codes(codigos_texto[codigos], categories=unicos)
+
+
+def etiquetas_equipo(df):
+    tajo = tajo_de_filas(df)
+    color_por_codigo = np.append(tajo.cat.categories.map(COLORES_TAJO).to_numpy(dtype=object), None)
+    color = color_por_codigo[tajo.cat.codes.to_numpy()]
+
+    codigos, pares = pd.factorize(
+        pd.MultiIndex.from_arrays([df["Equipo"].astype(object), color])
+    )
+    textos = [
+        f"<b style='color:{c}'>{eq}</b>" if isinstance(c, str) else eq
+        for eq, c in pares
+    ]
+    return _categorica_desde_pares(codigos, textos)
+
+
+def texto_duracion(segundos, minimo=1800):
+    codigos, unicos = pd.factorize(segundos.astype("float64"))
+    textos = [
+        f"{int(s // 3600):02d}:{int((s % 3600) // 60):02d}" if s >= minimo else ""
+        for s in unicos
+    ]
+    # Duración nula (factorize la marca con -1) -> texto vacío
+    textos.append("")
+    return _categorica_desde_pares(codigos, textos)
+
+
+# =====================================================
+# ANOTACIONES Y LINEAS GUIA DEL GANTT
+# =====================================================
+# Se arman como listas de dicts en una sola pasada y se asignan al layout
+# de una vez; fig.add_annotation / fig.add_shape revalidan y copian el
+# layout completo en cada llamada.
+def _partir_en_dos_lineas(texto):
+    palabras = texto.split()
+    if len(palabras) >= 2:
+        mitad = len(palabras) // 2
+        return " ".join(palabras[:mitad]) + "<br>" + " ".join(palabras[mitad:])
+    return texto
+
+
+# Un rombo del color de cada tajo del archivo de tajos
+def leyenda_tajos():
+    return "&nbsp;&nbsp;&nbsp;&nbsp;".join(
+        f"<span style='color:{color}'>◆</span> {tajo}" for tajo, color in COLORES_TAJO.items()
+    )
+
+
+def anotaciones_descripcion(df, min_minutos=20):
+    descripcion = df["Descripcion"].astype("string").str.strip().fillna("")
+    duracion_min = (df["Hora Fin"] - df["Hora Inicio"]).dt.total_seconds() / 60
+
+    # Solo intervalos con descripción y de más de `min_minutos`
+    visibles = (descripcion != "") & (duracion_min > min_minutos)
+    sub = df.loc[visibles, ["Hora Inicio", "Hora Fin", "Equipo_label"]]
+
+    textos = descripcion[visibles]
+    partidos = {t: _partir_en_dos_lineas(t) for t in textos.unique()}
+
+    centros = sub["Hora Inicio"] + (sub["Hora Fin"] - sub["Hora Inicio"]) / 2
+
+    return [
+        dict(
+            x=x,
+            y=y,
+            text=partidos[t],
+            showarrow=False,
+            yshift=70,
+            font=dict(size=20, color="black"),
+        )
+        for x, y, t in zip(centros.tolist(), sub["Equipo_label"].tolist(), textos.tolist())
+    ]
+
+
+def lineas_guia(inicio, fin, n_equipos, cada="30min"):
+    return [
+        dict(
+            type="line",
+            x0=hora, x1=hora,
+            y0=-0.5, y1=n_equipos - 0.5,
+            line=dict(color="lightgray", width=1, dash="dot"),
+            layer="below",
+        )
+        for hora in pd.date_range(inicio, fin, freq=cada).tolist()
+    ]
+
+
+# =====================================================
+# LAYOUT COMUN
+# =====================================================
+# Marcas del eje x y líneas guía según el largo de la ventana
+def escala_tiempo(inicio, fin):
+    horas = (fin - inicio) / timedelta(hours=1)
+    if horas <= 24:
+        return 3600000, "30min"
+    if horas <= 72:
+        return 6 * 3600000, "3h"
+    return 24 * 3600000, "12h"
+
+
+def altura_fila(n_equipos):
+    if n_equipos <= EQUIPOS_MODO_DETALLE:
+        return ALTURA_FILA_DETALLE
+    return max(
+        ALTURA_FILA_MIN,
+        min(ALTURA_FILA_DETALLE, ALTURA_GANTT_OBJETIVO // n_equipos),
+    )
+
+
+def _aplicar_layout(fig, titulo, inicio, fin, categorias, altura, logos):
+    dtick, _ = escala_tiempo(inicio, fin)
+
+    fig.update_yaxes(
+        tickfont=dict(size=13),
+        type="category",
+        categoryorder="array",
+        categoryarray=categorias,
+        autorange="reversed",
+        title=""
+    )
+    fig.update_xaxes(
+        range=[
+            inicio,
+            fin + timedelta(minutes=10)
+        ],
+        dtick=dtick
+    )
+
+    fig.update_layout(
+        height=altura,
+
+        title=dict(
+            text=titulo,
+            x=0.5,
+            xanchor="center",
+            y=0.99
+        ),
+
+        plot_bgcolor="#ffffff",
+        paper_bgcolor="#ffffff",
+        bargap=0,
+        bargroupgap=0.65,
+        font=dict(size=13, color="black"),
+
+        margin=dict(t=160),
+
+        images=[
+            dict(
+                source=logos[0],
+                xref="paper",
+                yref="paper",
+                x=-0.025,
+                y=1.05,
+                sizex=0.15,
+                sizey=0.15,
+                xanchor="left",
+                yanchor="top"
+            ),
+            dict(
+                source=logos[1],
+                xref="paper",
+                yref="paper",
+                x=0.99,
+                y=1.05,
+                sizex=0.15,
+                sizey=0.15,
+                xanchor="right",
+                yanchor="top"
+            )
+        ],
+
+        legend=dict(
+            orientation="h",
+            yanchor="top",
+            y=1.04,
+            xanchor="center",
+            x=0.475,
+            title=dict(text=""),
+            font=dict(color="black", size=20)
+        )
+    )
+
+    fig.update_layout(
+    annotations=[
+        dict(
+            text=leyenda_tajos(),
+            x=0.475,
+            y=1.025,
+            xref="paper",
+            yref="paper",
+            showarrow=False,
+            font=dict(size=16, color="black"),
+            xanchor="center",
+            align="center"
+            )
+        ]
+    )
+
+    fig.update_xaxes(title_font=dict(color="black"), tickfont=dict(color="black", size=16))
+    fig.update_yaxes(title_font=dict(color="black"), tickfont=dict(color="black", size=20))
+
+    fig.update_xaxes(dtick=dtick)
+
+
+# =====================================================
+# FILTROS EN EL NAVEGADOR
+# =====================================================
+# Un menú de plotly.js que deja en el eje y solo las filas de un tajo o
+# de un tipo de equipo (relayout de categoryarray, rango y alto): filtrar
+# no vuelve a ejecutar el script ni a mandar la figura. Los estados se
+# filtran desde la leyenda (clic oculta, doble clic aísla).
+def grupos_de_filas(df):
+    filas = df.drop_duplicates("Equipo_label")
+    etiquetas = filas["Equipo_label"].astype(object).to_numpy()
+    tajo = tajo_de_filas(filas)
+    tipo = tipo_equipo(filas["Equipo"].astype(object)).to_numpy()
+
+    grupos = {}
+    for nombre in tajo.dropna().unique():
+        grupos[nombre] = etiquetas[(tajo == nombre).to_numpy()].tolist()
+    for nombre in pd.unique(tipo):
+        grupos[nombre] = etiquetas[tipo == nombre].tolist()
+    return grupos
+
+
+def _vista(nombre, filas, alto_fila, alto_extra):
+    return dict(
+        label=f"{nombre} ({len(filas)})",
+        method="relayout",
+        args=[{
+            "yaxis.categoryarray": filas,
+            "yaxis.range": [len(filas) - 0.5, -0.5],
+            "height": alto_fila * len(filas) + alto_extra,
+        }],
+    )
+
+
+def agregar_filtros(fig, df, categorias, alto_fila, alto_extra=0, claves=None):
+    grupos = grupos_de_filas(df)
+    if claves is not None:
+        categorias = [claves[c] for c in categorias]
+        grupos = {nombre: [claves[f] for f in filas] for nombre, filas in grupos.items()}
+
+    botones = [_vista("Todos", categorias, alto_fila, alto_extra)]
+    for nombre, filas in grupos.items():
+        en_grupo = set(filas)
+        filas = [c for c in categorias if c in en_grupo]
+        if 0 < len(filas) < len(categorias):
+            botones.append(_vista(nombre, filas, alto_fila, alto_extra))
+
+    if len(botones) > 1:
+        fig.update_layout(updatemenus=[dict(
+            type="dropdown",
+            buttons=botones,
+            active=0,
+            showactive=True,
+            x=0.13,
+            xanchor="left",
+            y=1.0,
+            yanchor="bottom",
+            bgcolor="white",
+            font=dict(color="black", size=14),
+        )])
+
+
+# =====================================================
+# GANTT DETALLADO (SVG)
+# =====================================================
+def construir_gantt(df, titulo, inicio, fin, logos):
+    fig = px.timeline(
+        df,
+        x_start="Hora Inicio",
+        x_end="Hora Fin",
+        y="Equipo_label",
+        color="Estado",
+        text="DuracionTexto",
+        color_discrete_map=COLORES_ESTADO,
+        custom_data=["Descripcion", "DuracionTexto"]
+    )
+
+    categorias = df["Equipo_label"].drop_duplicates().tolist()
+
+    _aplicar_layout(
+        fig, titulo, inicio, fin, categorias,
+        ALTURA_FILA_DETALLE * len(categorias), logos,
+    )
+
+    fig.update_traces(
+        marker_line_color='black',
+        marker_line_width=0.5,
+        textposition="inside",
+        insidetextanchor="middle",
+        textfont=dict(color="black", size=17.5),
+    )
+
+    fig.update_layout(
+        annotations=[*fig.layout.annotations, *anotaciones_descripcion(df)],
+        shapes=lineas_guia(inicio, fin, len(categorias), escala_tiempo(inicio, fin)[1]),
+    )
+    agregar_filtros(fig, df, categorias, ALTURA_FILA_DETALLE)
+
+    return fig
+
+
+# =====================================================
+# GANTT PARA FLOTAS GRANDES (WEBGL)
+# =====================================================
+# Cada intervalo es un segmento grueso de una traza Scattergl por Estado
+# (segmentos separados por None), así el navegador dibuja con WebGL en
+# lugar de un <path> SVG por barra. Las descripciones van en el hover.
+def _segmentos(valores_inicio, valores_fin, hueco=None):
+    n = len(valores_inicio)
+    puntos = np.full(3 * n, hueco, dtype=object if hueco is None else "float64")
+    puntos[0::3] = valores_inicio
+    puntos[1::3] = valores_fin
+    return puntos
+
+
+# Clave corta de cada fila del eje y: el equipo, numerado si el mismo
+# equipo tiene etiquetas de más de un tajo. La etiqueta con color va solo
+# en el texto de las marcas del eje, no repetida en cada punto.
+def claves_de_filas(df):
+    filas = df.drop_duplicates("Equipo_label")
+    equipos = filas["Equipo"].astype(str)
+    repeticion = equipos.groupby(equipos).cumcount().to_numpy()
+    return {
+        etiqueta: equipo if r == 0 else f"{equipo} ({r + 1})"
+        for etiqueta, equipo, r in zip(
+            filas["Equipo_label"].astype(object), equipos, repeticion
+        )
+    }
+
+
+# Horas como milisegundos (float64): plotly las manda como arreglo binario
+# y no como un string ISO por punto
+def _milisegundos(horas):
+    return horas.to_numpy(dtype="datetime64[ms]").astype("int64").astype("float64")
+
+
+def construir_gantt_webgl(df, titulo, inicio, fin, logos, alto_fila):
+    fig = go.Figure()
+
+    df = df[df["Hora Inicio"].notna() & df["Hora Fin"].notna()]
+    # Descripción y duración solo en el punto de inicio de cada tramo
+    hover = (
+        df["Descripcion"].astype("string").fillna("") + "<br>"
+        + df["DuracionTexto"].astype("string")
+    ).to_numpy(dtype=object)
+    inicios, fines = _milisegundos(df["Hora Inicio"]), _milisegundos(df["Hora Fin"])
+
+    categorias = df["Equipo_label"].drop_duplicates().tolist()
+    claves = claves_de_filas(df)
+    filas = df["Equipo_label"].astype(object).map(claves).to_numpy(dtype=object)
+
+    estados = df["Estado"].astype("string").fillna("")
+    orden = [e for e in COLORES_ESTADO if (estados == e).any()]
+    orden += [e for e in estados.unique() if e not in COLORES_ESTADO]
+
+    for estado in orden:
+        m = (estados == estado).to_numpy()
+
+        fig.add_trace(
+            go.Scattergl(
+                x=_segmentos(inicios[m], fines[m], hueco=np.nan),
+                y=_segmentos(filas[m], filas[m]),
+                hovertext=_segmentos(hover[m], None),
+                mode="lines",
+                name=estado,
+                line=dict(color=COLORES_ESTADO.get(estado, COLOR_SIN_ESTADO),
+                          width=max(4, int(alto_fila * 0.35))),
+                connectgaps=False,
+                hoverinfo="y+text+name",
+            )
+        )
+
+    claves_categorias = [claves[c] for c in categorias]
+
+    _aplicar_layout(
+        fig, titulo, inicio, fin, claves_categorias,
+        alto_fila * len(categorias) + 200, logos,
+    )
+    fig.update_xaxes(type="date")
+    fig.update_yaxes(
+        tickmode="array", tickvals=claves_categorias, ticktext=categorias,
+        tickfont=dict(color="black", size=min(20, max(10, alto_fila // 3))),
+    )
+    fig.update_layout(
+        shapes=lineas_guia(inicio, fin, len(categorias), escala_tiempo(inicio, fin)[1])
+    )
+    agregar_filtros(fig, df, categorias, alto_fila, alto_extra=200, claves=claves)
+
+    return fig
+
+
+# =====================================================
+# PAGINACION DE EQUIPOS
+# =====================================================
+def bloques_de_equipos(df, tamano=BLOQUE_EQUIPOS):
+    equipos = df["Equipo"].dropna().drop_duplicates().tolist()
+    return [
+        equipos[i:i + tamano] for i in range(0, len(equipos), tamano)
+    ] or [[]]
+
+
+def filtrar_equipos(df, equipos):
+    return df[df["Equipo"].isin(equipos)]
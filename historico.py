@@ -0,0 +1,186 @@
+import os
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime
+
+import pandas as pd
+
+from demoras import DIMENSIONES_DEMORAS
+from kpis import DIMENSIONES_CUBO, kpis_por_equipo
+
+RUTA_HISTORICO = os.environ.get("HISTORICO_DB", "historico.sqlite3")
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS turnos (
+    fecha TEXT NOT NULL,
+    turno TEXT NOT NULL,
+    hash TEXT,
+    guardado TEXT NOT NULL,
+    PRIMARY KEY (fecha, turno)
+);
+
+CREATE TABLE IF NOT EXISTS duraciones (
+    fecha TEXT NOT NULL,
+    turno TEXT NOT NULL,
+    equipo TEXT,
+    estado TEXT,
+    categoria TEXT,
+    descripcion TEXT,
+    segundos REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_duraciones_turno ON duraciones (fecha, turno, equipo);
+CREATE INDEX IF NOT EXISTS ix_duraciones_estado ON duraciones (estado, fecha);
+
+CREATE TABLE IF NOT EXISTS kpis_equipo (
+    fecha TEXT NOT NULL,
+    turno TEXT NOT NULL,
+    equipo TEXT NOT NULL,
+    tipo TEXT,
+    horas_totales REAL,
+    horas_operativas REAL,
+    operatividad REAL,
+    metraje REAL,
+    dm REAL,
+    ue REAL,
+    PRIMARY KEY (fecha, turno, equipo)
+);
+CREATE INDEX IF NOT EXISTS ix_kpis_equipo ON kpis_equipo (equipo, fecha);
+
+CREATE TABLE IF NOT EXISTS demoras_turno (
+    fecha TEXT NOT NULL,
+    turno TEXT NOT NULL,
+    clave TEXT,
+    descripcion TEXT,
+    equipo TEXT,
+    tajo TEXT,
+    ubicacion TEXT,
+    hora INTEGER,
+    segundos REAL NOT NULL,
+    eventos INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_demoras_turno ON demoras_turno (fecha, turno);
+"""
+
+COLUMNAS_KPIS = {
+    "Tipo": "tipo",
+    "Horas_totales": "horas_totales",
+    "Horas_operativas": "horas_operativas",
+    "Operatividad": "operatividad",
+    "Metraje (m)": "metraje",
+    "DM": "dm",
+    "UE": "ue",
+}
+
+
+def _texto_fecha(fecha):
+    return pd.Timestamp(fecha).date().isoformat()
+
+
+def _filas(df):
+    return df.astype(object).where(df.notna(), None).itertuples(index=False, name=None)
+
+
+# =====================================================
+# HISTORICO DE TURNOS (SQLITE)
+# =====================================================
+# Cada turno procesado se guarda como su cubo de duraciones, el resumen
+# de KPIs por equipo y, si se pasa, el rollup de demoras (demoras.py),
+# indexados por fecha de operación, turno y equipo. Volver a guardar un
+# turno reemplaza lo que había.
+class HistoricoTurnos:
+    def __init__(self, ruta=RUTA_HISTORICO):
+        self.ruta = ruta
+        with self._conexion() as con:
+            con.executescript(ESQUEMA)
+
+    @contextmanager
+    def _conexion(self):
+        con = sqlite3.connect(self.ruta)
+        try:
+            with con:
+                yield con
+        finally:
+            con.close()
+
+    def hash_guardado(self, fecha, turno):
+        with self._conexion() as con:
+            fila = con.execute(
+                "SELECT hash FROM turnos WHERE fecha = ? AND turno = ?",
+                (_texto_fecha(fecha), turno),
+            ).fetchone()
+        return fila[0] if fila else None
+
+    # Si el turno ya está guardado con el mismo archivo no se reescribe
+    def guardar_turno(self, fecha, turno, cubo, hash_origen=None, demoras=None):
+        if hash_origen is not None and self.hash_guardado(fecha, turno) == hash_origen:
+            return
+
+        fecha = _texto_fecha(fecha)
+
+        duraciones = cubo.reset_index()[DIMENSIONES_CUBO + ["Segundos"]]
+        duraciones.insert(0, "turno", turno)
+        duraciones.insert(0, "fecha", fecha)
+
+        kpis = kpis_por_equipo(cubo).reset_index()
+        kpis = kpis[["Equipo"] + list(COLUMNAS_KPIS)]
+        kpis.insert(0, "turno", turno)
+        kpis.insert(0, "fecha", fecha)
+
+        if demoras is not None:
+            demoras = demoras[DIMENSIONES_DEMORAS + ["Segundos", "Eventos"]].copy()
+            demoras.insert(0, "turno", turno)
+            demoras.insert(0, "fecha", fecha)
+
+        with self._conexion() as con:
+            for tabla in ("turnos", "duraciones", "kpis_equipo", "demoras_turno"):
+                con.execute(
+                    f"DELETE FROM {tabla} WHERE fecha = ? AND turno = ?", (fecha, turno)
+                )
+
+            con.execute(
+                "INSERT INTO turnos VALUES (?, ?, ?, ?)",
+                (fecha, turno, hash_origen, datetime.now().isoformat(timespec="seconds")),
+            )
+            con.executemany(
+                "INSERT INTO duraciones VALUES (?, ?, ?, ?, ?, ?, ?)", _filas(duraciones)
+            )
+            con.executemany(
+                "INSERT INTO kpis_equipo VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                _filas(kpis),
+            )
+            if demoras is not None:
+                con.executemany(
+                    "INSERT INTO demoras_turno VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    _filas(demoras),
+                )
+
+    def _consultar(self, sql, parametros):
+        with self._conexion() as con:
+            return pd.read_sql_query(sql, con, params=parametros)
+
+    def turnos_guardados(self):
+        return self._consultar(
+            "SELECT fecha, turno, hash, guardado FROM turnos ORDER BY fecha, turno", ()
+        )
+
+    def tendencia(self, desde, hasta, equipos=None):
+        sql = "SELECT * FROM kpis_equipo WHERE fecha BETWEEN ? AND ?"
+        parametros = [_texto_fecha(desde), _texto_fecha(hasta)]
+        if equipos:
+            sql += f" AND equipo IN ({', '.join('?' * len(equipos))})"
+            parametros += list(equipos)
+
+        df = self._consultar(sql + " ORDER BY fecha, turno, equipo", parametros)
+        return df.rename(columns={v: k for k, v in COLUMNAS_KPIS.items()} | {"equipo": "Equipo"})
+
+    # Rollup de demoras de todos los turnos del rango, sumado en SQLite:
+    # una fila por (descripción, equipo, ubicación, hora del turno)
+    def demoras_agregadas(self, desde, hasta):
+        return self._consultar(
+            "SELECT clave AS Clave, descripcion AS Descripcion, equipo AS Equipo, "
+            "tajo AS Tajo, ubicacion AS Ubicacion, hora AS Hora, "
+            "SUM(segundos) AS Segundos, SUM(eventos) AS Eventos "
+            "FROM demoras_turno WHERE fecha BETWEEN ? AND ? "
+            "GROUP BY clave, descripcion, equipo, tajo, ubicacion, hora",
+            [_texto_fecha(desde), _texto_fecha(hasta)],
+        )
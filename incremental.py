@@ -0,0 +1,108 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from en_vivo import EstadoEnVivo, eventos_de
+from kpis import cubo_duraciones
+
+# Con menos filas, reconstruir el cubo cuesta menos que actualizarlo
+FILAS_MINIMAS_INCREMENTAL = 50_000
+
+COLUMNAS_FILA = [
+    "Equipo", "Hora Inicio", "Hora Fin", "Estado", "Categoria", "Descripcion", "Ubicacion",
+]
+
+
+# Huella de una sola fila (por valor, también en columnas categóricas)
+def _huella_fila(df, i):
+    columnas = [c for c in COLUMNAS_FILA if c in df.columns]
+    return int(pd.util.hash_pandas_object(df.iloc[[i]][columnas], index=False).iloc[0])
+
+
+# Cubo + (sumar - restar), tocando solo las claves de la cola. Las claves
+# que solo aportaba la fila restada y quedan en cero se quitan, como si
+# nunca hubieran estado.
+def _sumar_cubos(cubo, restar, sumar):
+    cambio = sumar.sub(restar, fill_value=0)
+    posiciones = cubo.index.get_indexer(cambio.index)
+    existe = posiciones >= 0
+
+    valores = cubo.to_numpy(dtype="float64", copy=True)
+    valores[posiciones[existe]] += cambio.to_numpy()[existe]
+
+    solo_restada = ~cambio.index.isin(sumar.index)
+    vacias = posiciones[existe & solo_restada]
+    vacias = vacias[valores[vacias] == 0]
+
+    conservar = np.ones(len(valores), dtype=bool)
+    conservar[vacias] = False
+    actualizado = pd.Series(valores, index=cubo.index, name=cubo.name)[conservar]
+    return pd.concat([actualizado, cambio[~existe]])
+
+
+# =====================================================
+# RECARGA INCREMENTAL DEL TURNO
+# =====================================================
+# Despacho agrega filas al final de la bitácora y solo la última puede
+# seguir cambiando (un intervalo abierto que se alarga). Si la bitácora
+# nueva tiene al menos las filas ya vistas y la penúltima vista sigue
+# igual (la huella de una sola fila), el cubo se actualiza con la cola:
+# se resta lo que aportaba la última fila anterior y se suma la cola
+# nueva. Si no, se reconstruye completo. Las filas van en el orden del
+# archivo, antes de ordenar para el Gantt. Una fila ya vista que se edita
+# en el medio del archivo no se detecta: es para bitácoras que solo crecen.
+# El motor en vivo recibe la misma cola como eventos (la última fila se
+# reenvía y reemplaza su intervalo); actualizar devuelve el cubo y las
+# vistas del motor tomadas juntas, bajo el mismo lock.
+class AcumuladorTurno:
+    def __init__(self):
+        self.cubo = None
+        self.en_vivo = None
+        self.nuevos = 0
+        self.modificados = 0
+        self.eliminados = 0
+        self.equipos_recalculados = []
+        self._filas = 0
+        self._huella_borde = None
+        self._huella_ultima = None
+        self._cubo_ultima = None
+        self._lock = threading.Lock()
+
+    def actualizar(self, df):
+        with self._lock:
+            return self._actualizar(df)
+
+    def _continua(self, df):
+        if self.cubo is None or self._filas == 0 or len(df) < self._filas:
+            return False
+        return self._filas < 2 or _huella_fila(df, self._filas - 2) == self._huella_borde
+
+    def _actualizar(self, df):
+        n = len(df)
+
+        if self._continua(df):
+            desde = self._filas - 1
+            self.nuevos = n - self._filas
+            self.modificados = int(_huella_fila(df, desde) != self._huella_ultima)
+            self.eliminados = 0
+            cola = df.iloc[desde:] if self.nuevos or self.modificados else df.iloc[:0]
+            if n < FILAS_MINIMAS_INCREMENTAL:
+                self.cubo = cubo_duraciones(df)
+                self.en_vivo = EstadoEnVivo.desde(df)
+            elif len(cola):
+                self.cubo = _sumar_cubos(self.cubo, self._cubo_ultima, cubo_duraciones(cola))
+                self.en_vivo.consumir(eventos_de(cola))
+        else:
+            cola = df
+            self.nuevos, self.modificados, self.eliminados = n, 0, self._filas
+            self.cubo = cubo_duraciones(df)
+            self.en_vivo = EstadoEnVivo.desde(df)
+
+        self.equipos_recalculados = cola["Equipo"].dropna().unique().tolist()
+        self._filas = n
+        self._huella_borde = _huella_fila(df, n - 2) if n >= 2 else None
+        self._huella_ultima = _huella_fila(df, n - 1) if n else None
+        self._cubo_ultima = cubo_duraciones(df.iloc[n - 1:]) if n else None
+
+        return self.cubo, self.en_vivo.vistas()
@@ -0,0 +1,207 @@
+import pandas as pd
+
+from equipos import REGISTRO, TIPO_POR_DEFECTO, TIPOS_EQUIPO
+
+DIMENSIONES_CUBO = ["Equipo", "Estado", "Categoria", "Descripcion"]
+
+# =====================================================
+# FORMULAS DE METRAJE
+# =====================================================
+# Coeficientes indexados por Equipo (del registro de equipos), para
+# cruzarlos con columnas enteras
+COEFICIENTES_METRAJE = (
+    REGISTRO[["a_efectivo", "b"]].rename(columns={"a_efectivo": "a"}).dropna()
+)
+
+# =====================================================
+# CUBO DE DURACIONES
+# =====================================================
+# Una sola pasada groupby sobre la bitácora: segundos acumulados por
+# (Equipo, Estado, Categoria, Descripcion). Todas las tablas, metrajes,
+# proyecciones y pies del tablero se derivan de este cubo.
+def cubo_duraciones(df):
+    segundos = df["Segundos"].astype("float64")
+    claves = [df[c] for c in DIMENSIONES_CUBO]
+    return segundos.groupby(claves, dropna=False, sort=False, observed=True).sum()
+
+
+# Suma el cubo sobre los niveles pedidos, filtrando antes por valores
+# fijos de otros niveles (p. ej. Estado="Operativo"). Igual que un groupby
+# sobre la bitácora, las claves nulas quedan fuera del resultado.
+def sumar_cubo(cubo, niveles, **filtros):
+    for nivel, valor in filtros.items():
+        cubo = cubo[cubo.index.get_level_values(nivel) == valor]
+    return cubo.groupby(level=niveles, observed=True).sum()
+
+
+def horas_por_categoria(cubo):
+    tabla = (
+        (sumar_cubo(cubo, ["Equipo", "Categoria"]) / 3600)
+        .unstack("Categoria", fill_value=0)
+    )
+    # Columnas comunes (no categóricas) para poder agregar DM, UE, Tipo...
+    tabla.columns = tabla.columns.astype(object)
+    return tabla.reset_index()
+
+
+# =====================================================
+# METRAJE Y PROYECCION
+# =====================================================
+# Tipo de cada equipo cruzando con el registro; los que no están en él
+# cuentan como DTH
+def tipo_equipo(equipos):
+    equipos = pd.Index(equipos)
+    return (
+        REGISTRO["Tipo"]
+        .reindex(equipos.astype(object))
+        .fillna(TIPO_POR_DEFECTO)
+        .set_axis(equipos)
+        .rename("Tipo")
+    )
+
+
+# metros = a * horas + b para cada equipo con fórmula; 0 para el resto.
+# Con solo_positivas, los equipos sin horas (o con horas nulas) dan 0,
+# como en la proyección del turno.
+def calcular_metraje(horas, coeficientes=COEFICIENTES_METRAJE, solo_positivas=False):
+    coef = coeficientes.reindex(horas.index)
+    valido = coef["a"].notna()
+    if solo_positivas:
+        valido &= horas > 0
+
+    metros = coef["a"] * horas + coef["b"]
+    return metros.where(valido, 0).rename("Metraje (m)")
+
+
+def metros_por_tipo(metros):
+    return (
+        metros.groupby(tipo_equipo(metros.index).to_numpy())
+        .sum()
+        .reindex(TIPOS_EQUIPO, fill_value=0)
+    )
+
+
+# =====================================================
+# DISPONIBILIDAD MECANICA Y UTILIZACION EFECTIVA
+# =====================================================
+# Modelo de tiempos: cada Categoria de la bitácora cae en un balde. Las
+# horas por balde salen de un solo producto matricial (equipos x
+# categorías) @ (categorías x baldes); una categoría que no está en el
+# modelo no suma a ningún indicador.
+MODELO_TIEMPOS = {
+    "Tiempo de Producción": "Producción",
+    "Tiempo de NO Producción": "No producción",
+    "Retraso Operativo Planificado": "Retraso operativo",
+    "Retraso Operativo NO Planificado": "Retraso operativo",
+    "PERDIDA DE EQUIPO PLANIFICADA": "Pérdida planificada",
+    "PERDIDA DE EQUIPO NO PLANIFICADA": "Pérdida no planificada",
+    "ECT": "ECT",
+}
+
+BALDES_TIEMPO = [
+    "Producción",
+    "No producción",
+    "Retraso operativo",
+    "Pérdida planificada",
+    "Pérdida no planificada",
+    "ECT",
+]
+
+# Tiempo en que el equipo está mecánicamente disponible; el resto de los
+# baldes son pérdidas de disponibilidad
+BALDES_DISPONIBLES = ["Producción", "No producción", "Retraso operativo"]
+
+# Intervalos que cuentan como falla para MTBF / MTTR
+BALDE_FALLA = "Pérdida no planificada"
+
+
+def matriz_modelo(categorias, modelo=MODELO_TIEMPOS):
+    baldes = pd.Series(modelo).reindex(pd.Index(categorias, dtype=object))
+    return (
+        pd.get_dummies(baldes, dtype="float64")
+        .reindex(columns=BALDES_TIEMPO, fill_value=0.0)
+        .to_numpy()
+    )
+
+
+# Horas por (Equipo, balde) a partir de la tabla de horas por categoría
+def horas_por_balde(horas_categoria, modelo=MODELO_TIEMPOS):
+    return pd.DataFrame(
+        horas_categoria.to_numpy(dtype="float64") @ matriz_modelo(horas_categoria.columns, modelo),
+        index=horas_categoria.index,
+        columns=BALDES_TIEMPO,
+    )
+
+
+def _cociente(numerador, denominador):
+    return (numerador / denominador).where(denominador > 0)
+
+
+# DM = disponible / total, UE = producción / disponible y su producto
+# (Rendimiento = producción / total). Con el número de fallas por equipo
+# se agregan MTBF y MTTR en horas.
+def indicadores_tiempo(baldes, fallas=None):
+    disponible = baldes[BALDES_DISPONIBLES].sum(axis=1)
+    total = baldes.sum(axis=1)
+
+    indicadores = pd.DataFrame({
+        "DM": _cociente(disponible, total).fillna(0),
+        "UE": _cociente(baldes["Producción"], disponible).fillna(0),
+        "Rendimiento": _cociente(baldes["Producción"], total).fillna(0),
+    })
+
+    if fallas is not None:
+        fallas = fallas.reindex(baldes.index, fill_value=0)
+        indicadores["Fallas"] = fallas
+        indicadores["MTBF (h)"] = _cociente(disponible, fallas)
+        indicadores["MTTR (h)"] = _cociente(baldes[BALDE_FALLA], fallas)
+
+    return indicadores
+
+
+def contar_fallas(df, modelo=MODELO_TIEMPOS):
+    falla = df["Categoria"].map(modelo).astype(object) == BALDE_FALLA
+    return falla.groupby(df["Equipo"], observed=True).sum().rename("Fallas")
+
+
+def calcular_dm_ue(df_pivot):
+    horas = df_pivot.set_index("Equipo")
+    indicadores = indicadores_tiempo(horas_por_balde(horas))
+
+    df_pivot["DM"] = indicadores["DM"].to_numpy()
+    df_pivot["UE"] = indicadores["UE"].to_numpy()
+    df_pivot["Tipo"] = tipo_equipo(df_pivot["Equipo"]).to_numpy()
+
+    return df_pivot
+
+
+# =====================================================
+# RESUMEN POR EQUIPO
+# =====================================================
+# Operatividad, metraje e indicadores del modelo de tiempos de cada
+# equipo del turno, todo a partir del cubo. Es la fila que se guarda en
+# el histórico y la que consolida el procesamiento por lotes (lote.py).
+# Las fallas (contar_fallas) no están en el cubo y son opcionales.
+def kpis_por_equipo(cubo, fallas=None):
+    horas_totales = (
+        sumar_cubo(cubo, ["Equipo", "Estado"]).groupby(level="Equipo", observed=True).sum()
+        / 3600
+    )
+    horas_operativas = sumar_cubo(cubo, "Equipo", Estado="Operativo") / 3600
+
+    resumen = pd.DataFrame({
+        "Horas_totales": horas_totales,
+        "Horas_operativas": horas_operativas,
+        "Metraje (m)": calcular_metraje(horas_operativas),
+    })
+    resumen[["Horas_operativas", "Metraje (m)"]] = (
+        resumen[["Horas_operativas", "Metraje (m)"]].fillna(0)
+    )
+    resumen["Operatividad"] = resumen["Horas_operativas"] / resumen["Horas_totales"]
+
+    baldes = horas_por_balde(horas_por_categoria(cubo).set_index("Equipo"))
+    resumen = resumen.join(indicadores_tiempo(baldes, fallas), how="outer")
+    resumen.insert(0, "Tipo", tipo_equipo(resumen.index).to_numpy())
+    resumen.index.name = "Equipo"
+
+    return resumen
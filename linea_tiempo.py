@@ -0,0 +1,163 @@
+from datetime import datetime, time, timedelta
+
+import numpy as np
+import pandas as pd
+
+from gantt import (
+    altura_fila,
+    construir_gantt,
+    construir_gantt_webgl,
+    filtrar_equipos,
+    texto_duracion,
+)
+from turnos import turno_del_nombre, turnos_de
+
+VENTANAS = {
+    "turno": "Turno",
+    "dia": "24 horas",
+    "todo": "Todo el registro",
+}
+
+# Cada turno se muestra de media hora antes de su inicio a media hora
+# antes de su fin (06:30–18:30 el T/D, 18:30–06:30 el T/N)
+INICIO_TURNO = {"T/D": time(6, 30), "T/N": time(18, 30)}
+DURACION_TURNO = timedelta(hours=12)
+
+# Parte mínima de los segundos registrados que debe caer en un mismo turno
+# para tomar la bitácora como de ese turno (el resto, registro de borde)
+PROPORCION_TURNO = 0.9
+
+# Con ventanas largas, los intervalos más cortos que ventana / esto no se
+# distinguen en pantalla y se funden con sus vecinos antes de dibujar.
+SEGMENTOS_POR_FILA = 600
+RESOLUCION_MINIMA = timedelta(minutes=5)
+
+
+# =====================================================
+# VENTANAS DE TIEMPO
+# =====================================================
+def ventana_turno(fecha, turno):
+    inicio = datetime.combine(fecha, INICIO_TURNO[turno])
+    return inicio, inicio + DURACION_TURNO
+
+
+def ventana_dia(fecha):
+    inicio = datetime.combine(fecha, INICIO_TURNO["T/D"])
+    return inicio, inicio + 2 * DURACION_TURNO
+
+
+def ventana_datos(df):
+    inicio = df["Hora Inicio"].min().floor("h")
+    fin = df["Hora Fin"].max().ceil("h")
+    return inicio.to_pydatetime(), fin.to_pydatetime()
+
+
+# Turnos (fecha de operación, turno) presentes en la bitácora, según la
+# hora de inicio de cada intervalo y la misma regla del encabezado.
+def turnos_en(df):
+    turno, fecha = turnos_de(df["Hora Inicio"])
+    pares = pd.DataFrame({"fecha": fecha.dt.date, "turno": turno}).dropna()
+    return list(pares.drop_duplicates().sort_values(["fecha", "turno"]).itertuples(index=False, name=None))
+
+
+# Turno (fecha de operación, turno) de la bitácora completa: el del nombre
+# del archivo si trae fecha y turno; si no, el turno que reúne casi todos
+# sus segundos. None si abarca varios turnos.
+def turno_de_bitacora(df, nombre=None, proporcion=PROPORCION_TURNO):
+    turno, fecha = turno_del_nombre(nombre) if nombre else (None, None)
+    if turno is not None and fecha is not None:
+        return fecha.date(), turno
+
+    turno, fecha = turnos_de(df["Hora Inicio"])
+    segundos = df["Segundos"].astype("float64").clip(lower=0).groupby(
+        [fecha.dt.date, turno]
+    ).sum()
+    if segundos.empty or segundos.sum() <= 0:
+        return None
+
+    principal = segundos.idxmax()
+    return principal if segundos[principal] >= proporcion * segundos.sum() else None
+
+
+def titulo_ventana(ventana, inicio, fin, turno=None):
+    if ventana == "turno":
+        return f"{inicio:%d-%m} {turno}"
+    if ventana == "dia":
+        return f"{inicio:%d-%m}"
+    return f"{inicio:%d-%m} AL {fin:%d-%m}"
+
+
+# =====================================================
+# RECORTE Y REDUCCION DE INTERVALOS
+# =====================================================
+# Quita los intervalos que caen fuera de la ventana (los que no tienen
+# horas válidas se conservan, como los conserva el Gantt)
+def recortar(df, inicio, fin):
+    fuera = (df["Hora Fin"] <= inicio) | (df["Hora Inicio"] >= fin)
+    return df[~fuera]
+
+
+def resolucion_para(inicio, fin):
+    resolucion = (fin - inicio) / SEGMENTOS_POR_FILA
+    return resolucion if resolucion > RESOLUCION_MINIMA else None
+
+
+# Reducción para ventanas largas, por equipo y en orden de inicio:
+# 1) cada intervalo corto (< resolución) se une al último intervalo largo
+#    que lo precede (o, al comienzo del equipo, a sus vecinos cortos), y el
+#    grupo toma Estado y Descripción de su intervalo más largo;
+# 2) segmentos consecutivos y contiguos con el mismo Estado se unen.
+# Las filas que quedan son del orden de ventana / resolución por equipo.
+def _fundir(df, grupo):
+    largo = df.groupby(grupo, sort=False)["Segundos"].idxmax()
+    fusion = df.loc[largo.to_numpy()].set_index(largo.index)
+    fusion["Hora Inicio"] = df.groupby(grupo, sort=False)["Hora Inicio"].min()
+    fusion["Hora Fin"] = df.groupby(grupo, sort=False)["Hora Fin"].max()
+    fusion["Segundos"] = (
+        (fusion["Hora Fin"] - fusion["Hora Inicio"]).dt.total_seconds().round().astype("Int32")
+    )
+    return fusion.reset_index(drop=True)
+
+
+def reducir_intervalos(df, resolucion):
+    df = df[df["Hora Inicio"].notna() & df["Hora Fin"].notna()]
+    df = df.sort_values(["Equipo", "Hora Inicio"]).reset_index(drop=True)
+    df["Segundos"] = df["Segundos"].fillna(0)
+
+    nuevo_equipo = (df["Equipo"] != df["Equipo"].shift()).to_numpy()
+    corto = (df["Segundos"] < resolucion.total_seconds()).to_numpy()
+    df = _fundir(df, np.cumsum(nuevo_equipo | ~corto))
+
+    estado = df["Estado"].astype(object)
+    continua = (
+        (df["Equipo"] == df["Equipo"].shift())
+        & ((estado == estado.shift()) | (estado.isna() & estado.shift().isna()))
+        & (df["Hora Inicio"] <= df["Hora Fin"].shift())
+    ).to_numpy()
+    df = _fundir(df, np.cumsum(~continua))
+
+    if "DuracionTexto" in df.columns:
+        df["DuracionTexto"] = texto_duracion(df["Segundos"])
+
+    return df
+
+
+# =====================================================
+# GANTT DE UNA VENTANA
+# =====================================================
+# Solo los intervalos de la ventana; en ventanas largas, además reducidos
+# a lo que se distingue en pantalla. En WebGL se puede limitar a un bloque
+# de `equipos`, manteniendo el alto de fila de la flota completa.
+def figura_ventana(df, inicio, fin, titulo, logos, webgl=False, equipos=None):
+    n_equipos = df["Equipo"].nunique()
+    df = recortar(df, inicio, fin)
+
+    resolucion = resolucion_para(inicio, fin)
+    if resolucion is not None:
+        df = reducir_intervalos(df, resolucion)
+
+    if webgl:
+        if equipos is not None:
+            df = filtrar_equipos(df, equipos)
+        return construir_gantt_webgl(df, titulo, inicio, fin, logos, altura_fila(n_equipos))
+    return construir_gantt(df, titulo, inicio, fin, logos)
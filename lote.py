@@ -0,0 +1,185 @@
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from functools import partial
+from pathlib import Path
+
+import pandas as pd
+
+from carga import FORMATOS_SOPORTADOS, hash_contenido, leer_bitacora
+from demoras import rollup_demoras
+from gantt import EQUIPOS_MODO_DETALLE, logos_base64, titulo_gantt
+from kpis import contar_fallas, cubo_duraciones, kpis_por_equipo
+from linea_tiempo import figura_ventana, titulo_ventana, ventana_turno
+from reportes import FORMATOS_REPORTE, exportar_reporte, imagen_disponible
+from tablero import procesar_turno
+from turnos import calcular_turno, turno_del_nombre
+from validacion import marcar_intervalos, reparar_intervalos
+
+# Fecha de operación y turno de una bitácora: se leen del nombre del
+# archivo (p. ej. "bitacora_2026-02-06_TN.xlsx") y, si no están, se
+# deducen de la fecha de modificación con la misma regla del tablero.
+def inferir_turno(ruta):
+    turno, fecha = turno_del_nombre(Path(ruta).stem)
+    if turno is None or fecha is None:
+        turno_mtime, fecha_mtime = calcular_turno(datetime.fromtimestamp(os.path.getmtime(ruta)))
+        turno, fecha = turno or turno_mtime, fecha or fecha_mtime
+
+    return turno, fecha
+
+
+# Reportes del turno (mismo Gantt y secciones que el tablero) en
+# `destino` + extensión de cada formato
+def escribir_reportes(procesado, fecha, turno, destino, formatos):
+    inicio, fin = ventana_turno(fecha.date(), turno)
+    gantt = figura_ventana(
+        procesado.df,
+        inicio,
+        fin,
+        titulo_gantt(titulo_ventana("turno", inicio, fin, turno)),
+        logos_base64(),
+        webgl=procesado.df["Equipo"].nunique() > EQUIPOS_MODO_DETALLE,
+    )
+    for formato in formatos:
+        Path(f"{destino}.{formato}").write_bytes(exportar_reporte(procesado, gantt, formato))
+
+
+# =====================================================
+# PROCESAMIENTO DE UN TURNO (SIN STREAMLIT)
+# =====================================================
+def procesar_archivo(ruta, reparar=False, reportes=None, formatos=("xlsx",)):
+    ruta = Path(ruta)
+    turno, fecha = inferir_turno(ruta)
+    contenido = ruta.read_bytes()
+
+    df = leer_bitacora(contenido, fecha.date(), ruta.name)
+    if reportes is not None:
+        procesado = procesar_turno(df, reparar=reparar)
+        escribir_reportes(procesado, fecha, turno, Path(reportes) / ruta.stem, formatos)
+        df, cubo = procesado.df, procesado.cubo
+    else:
+        if reparar:
+            df = reparar_intervalos(df, marcar_intervalos(df))
+        cubo = cubo_duraciones(df)
+
+    resumen = kpis_por_equipo(cubo, contar_fallas(df)).reset_index()
+    resumen.insert(0, "Archivo", ruta.name)
+    resumen.insert(0, "Turno", turno)
+    resumen.insert(0, "Fecha", fecha.date())
+
+    demoras = rollup_demoras(df, fecha, turno)
+
+    # Mismo origen que guarda la app: un turno reparado no pisa al original
+    hash_origen = hash_contenido(contenido) + (":reparado" if reparar else "")
+    return fecha, turno, hash_origen, cubo, resumen, demoras
+
+
+def _procesar_seguro(ruta, **opciones):
+    try:
+        return ruta, procesar_archivo(ruta, **opciones), None
+    except Exception as e:
+        return ruta, None, f"{type(e).__name__}: {e}"
+
+
+def buscar_bitacoras(carpeta):
+    return sorted(
+        p for p in Path(carpeta).rglob("*")
+        if p.is_file()
+        and p.suffix.lstrip(".").lower() in FORMATOS_SOPORTADOS
+        and not p.name.startswith("~$")
+    )
+
+
+def escribir_tabla(df, salida):
+    salida = Path(salida)
+    formato = salida.suffix.lower()
+    if formato == ".parquet":
+        df.to_parquet(salida, index=False)
+    elif formato == ".xlsx":
+        df.to_excel(salida, index=False)
+    else:
+        df.to_csv(salida, index=False)
+
+
+def procesar_carpeta(carpeta, procesos=None, historico=None, reparar=False,
+                     reportes=None, formatos=("xlsx",)):
+    rutas = buscar_bitacoras(carpeta)
+    resumenes = []
+    errores = []
+
+    if reportes is not None:
+        Path(reportes).mkdir(parents=True, exist_ok=True)
+    procesar = partial(_procesar_seguro, reparar=reparar, reportes=reportes, formatos=formatos)
+
+    with ProcessPoolExecutor(max_workers=procesos) as pool:
+        for ruta, resultado, error in pool.map(procesar, rutas, chunksize=4):
+            if error:
+                errores.append((ruta, error))
+                continue
+
+            fecha, turno, hash_origen, cubo, resumen, demoras = resultado
+            resumenes.append(resumen)
+            if historico is not None:
+                historico.guardar_turno(
+                    fecha, turno, cubo, hash_origen=hash_origen, demoras=demoras
+                )
+
+    consolidado = (
+        pd.concat(resumenes, ignore_index=True)
+        .sort_values(["Fecha", "Turno", "Equipo"])
+        .reset_index(drop=True)
+        if resumenes else pd.DataFrame()
+    )
+    return consolidado, errores
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Procesa una carpeta de bitácoras de turno y consolida "
+                    "operatividad, metraje, DM, UE, MTBF y MTTR por turno y equipo."
+    )
+    parser.add_argument("carpeta", help="carpeta con bitácoras (.xlsx, .csv, .parquet, ...)")
+    parser.add_argument("-o", "--salida", default="consolidado.csv",
+                        help="archivo de salida (.csv, .xlsx o .parquet)")
+    parser.add_argument("-p", "--procesos", type=int, default=None,
+                        help="procesos en paralelo (por defecto, todos los núcleos)")
+    parser.add_argument("--historico", metavar="RUTA_DB",
+                        help="guardar además cada turno en el histórico SQLite")
+    parser.add_argument("--reparar", action="store_true",
+                        help="recortar solapes y descartar filas sin hora antes de agregar")
+    parser.add_argument("--reportes", metavar="CARPETA",
+                        help="escribir además el reporte de cada turno en CARPETA")
+    parser.add_argument("--formatos", nargs="+", choices=FORMATOS_REPORTE, default=["xlsx"],
+                        help="formatos de los reportes (png y pdf requieren kaleido)")
+    args = parser.parse_args(argv)
+
+    if args.reportes and {"png", "pdf"} & set(args.formatos) and not imagen_disponible():
+        parser.error("los reportes png/pdf requieren kaleido (pip install kaleido)")
+
+    historico = None
+    if args.historico:
+        from historico import HistoricoTurnos
+        historico = HistoricoTurnos(args.historico)
+
+    consolidado, errores = procesar_carpeta(
+        args.carpeta, args.procesos, historico, args.reparar,
+        args.reportes, args.formatos,
+    )
+
+    for ruta, error in errores:
+        print(f"[ERROR] {ruta}: {error}", file=sys.stderr)
+
+    if consolidado.empty:
+        print("No se procesó ninguna bitácora.", file=sys.stderr)
+        return 1
+
+    escribir_tabla(consolidado, args.salida)
+    n_turnos = consolidado[["Fecha", "Turno", "Archivo"]].drop_duplicates().shape[0]
+    print(f"{n_turnos} turnos, {len(consolidado)} filas -> {args.salida}")
+    return 1 if errores else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
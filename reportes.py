@@ -0,0 +1,187 @@
+import importlib.util
+import io
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+
+from gantt import logos_base64
+from kpis import contar_fallas, kpis_por_equipo, tipo_equipo
+from tablero import promedios_en_porcentaje, resaltar_rtr
+
+FORMATOS_REPORTE = ["xlsx", "pdf", "png", "html"]
+
+TIPOS_MIME = {
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "pdf": "application/pdf",
+    "png": "image/png",
+    "html": "text/html",
+}
+
+ANCHO_IMAGEN = 1920
+ALTO_INDICADORES = 220
+ALTO_FILA_TABLA = 30
+
+COLUMNAS_INTERVALOS = [
+    "Equipo", "Hora Inicio", "Hora Fin", "Estado", "Categoria",
+    "Descripcion", "Ubicacion", "Segundos",
+]
+
+
+class ExportacionNoDisponible(RuntimeError):
+    pass
+
+
+def tabla_avance(resumen):
+    return pd.DataFrame({
+        "Tipo": ["DTH", "RTR"],
+        "Metros perforados": [resumen.x_metros_dth, resumen.y_metros_rtr],
+        "Metros proyectados": [resumen.metraje_dth_proj, resumen.metraje_rtr_proj],
+    })
+
+
+# =====================================================
+# EXCEL (UNA HOJA POR SECCION DEL TABLERO)
+# =====================================================
+# Todo sale del turno ya procesado (resumen y cubo): no se vuelve a leer
+# ni a agregar la bitácora.
+def reporte_excel(procesado):
+    resumen = procesado.resumen
+    buffer = io.BytesIO()
+
+    with pd.ExcelWriter(buffer, engine="openpyxl") as writer:
+        resumen.df_resumen.style.apply(resaltar_rtr, axis=None).to_excel(
+            writer, sheet_name="Estado actual", index=False
+        )
+        tabla_avance(resumen).to_excel(writer, sheet_name="Avance", index=False)
+        promedios_en_porcentaje(resumen.promedios).to_excel(
+            writer, sheet_name="DM y UE", index=False
+        )
+        kpis_por_equipo(procesado.cubo, contar_fallas(procesado.df)).reset_index().to_excel(
+            writer, sheet_name="KPIs por equipo", index=False
+        )
+        procesado.df[COLUMNAS_INTERVALOS].to_excel(
+            writer, sheet_name="Intervalos", index=False
+        )
+        if len(procesado.problemas):
+            procesado.problemas.to_excel(writer, sheet_name="Validación", index=False)
+
+    return buffer.getvalue()
+
+
+# =====================================================
+# FIGURA DEL REPORTE (IMAGEN / PDF / HTML)
+# =====================================================
+# Una sola figura: el Gantt ya construido arriba, los cuatro indicadores
+# de avance y proyección al medio y las tablas de estado y DM/UE abajo.
+def _ejes_sin_dominio(eje):
+    return {k: v for k, v in eje.to_plotly_json().items() if k not in ("domain", "anchor")}
+
+
+def _tabla(df, colores_fila=None):
+    return go.Table(
+        header=dict(values=[f"<b>{c}</b>" for c in df.columns], fill_color="#D9D9D9",
+                    font=dict(color="black", size=14)),
+        cells=dict(values=[df[c].astype(str) for c in df.columns],
+                   fill_color=[colores_fila] if colores_fila is not None else "white",
+                   font=dict(color="black", size=13), height=ALTO_FILA_TABLA),
+    )
+
+
+def figura_reporte(procesado, gantt):
+    resumen = procesado.resumen
+    df_resumen = resumen.df_resumen
+    promedios = promedios_en_porcentaje(resumen.promedios)
+
+    alto_gantt = gantt.layout.height or 800
+    alto_tablas = ALTO_FILA_TABLA * (max(len(df_resumen), len(promedios)) + 2)
+
+    fig = make_subplots(
+        rows=3,
+        cols=4,
+        specs=[
+            [{"type": "xy", "colspan": 4}, None, None, None],
+            [{"type": "indicator"}] * 4,
+            [{"type": "table", "colspan": 2}, None, {"type": "table", "colspan": 2}, None],
+        ],
+        row_heights=[alto_gantt, ALTO_INDICADORES, alto_tablas],
+        vertical_spacing=0.02,
+    )
+
+    for traza in gantt.data:
+        fig.add_trace(traza, row=1, col=1)
+    fig.update_xaxes(_ejes_sin_dominio(gantt.layout.xaxis), row=1, col=1)
+    fig.update_yaxes(_ejes_sin_dominio(gantt.layout.yaxis), row=1, col=1)
+
+    indicadores = [
+        ("METROS PERFORADOS DTH", resumen.x_metros_dth, "black"),
+        ("METROS PERFORADOS RTR", resumen.y_metros_rtr, "black"),
+        ("METROS PROYECTADOS DTH", resumen.metraje_dth_proj, "#1F4ED8"),
+        ("METROS PROYECTADOS RTR", resumen.metraje_rtr_proj, "#1F4ED8"),
+    ]
+    for col, (texto, valor, color) in enumerate(indicadores, start=1):
+        fig.add_trace(
+            go.Indicator(
+                mode="number",
+                value=valor,
+                number=dict(valueformat=",.0f", font=dict(size=60, color=color)),
+                title=dict(text=texto, font=dict(size=18, color="black")),
+            ),
+            row=2, col=col,
+        )
+
+    colores = np.where(tipo_equipo(df_resumen["Equipo"]) == "RTR", "#00B050", "white")
+    fig.add_trace(_tabla(df_resumen, colores), row=3, col=1)
+    fig.add_trace(_tabla(promedios), row=3, col=3)
+
+    fig.update_layout(
+        height=alto_gantt + ALTO_INDICADORES + alto_tablas + 200,
+        title=gantt.layout.title,
+        legend=gantt.layout.legend,
+        # El reporte se ve fuera del servidor: logos incrustados aunque el
+        # Gantt de pantalla los tenga como URL de archivos estáticos
+        images=[
+            dict(imagen.to_plotly_json(), source=logo)
+            for imagen, logo in zip(gantt.layout.images, logos_base64())
+        ],
+        annotations=gantt.layout.annotations,
+        shapes=gantt.layout.shapes,
+        barmode=gantt.layout.barmode,
+        bargap=gantt.layout.bargap,
+        font=gantt.layout.font,
+        margin=gantt.layout.margin,
+        plot_bgcolor="#ffffff",
+        paper_bgcolor="#ffffff",
+    )
+
+    return fig
+
+
+def imagen_disponible():
+    return importlib.util.find_spec("kaleido") is not None
+
+
+def _imagen(fig, formato):
+    if not imagen_disponible():
+        raise ExportacionNoDisponible(
+            f"Exportar a {formato.upper()} requiere kaleido (pip install kaleido)"
+        )
+    try:
+        return fig.to_image(format=formato, width=ANCHO_IMAGEN, height=fig.layout.height)
+    except RuntimeError as e:
+        # kaleido instalado pero sin navegador Chrome disponible
+        raise ExportacionNoDisponible(str(e)) from e
+
+
+def exportar_reporte(procesado, gantt, formato):
+    if formato == "xlsx":
+        return reporte_excel(procesado)
+
+    fig = figura_reporte(procesado, gantt)
+    if formato == "html":
+        return fig.to_html(include_plotlyjs=True, full_html=True).encode("utf-8")
+    if formato in ("png", "pdf"):
+        return _imagen(fig, formato)
+
+    raise ValueError(f"Formato de reporte no soportado: {formato}")
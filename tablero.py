@@ -0,0 +1,286 @@
+from dataclasses import dataclass
+from functools import cached_property
+
+import pandas as pd
+import plotly.express as px
+
+from gantt import COLORES_ESTADO, etiquetas_equipo, texto_duracion
+from kpis import (
+    calcular_dm_ue,
+    calcular_metraje,
+    cubo_duraciones,
+    horas_por_categoria,
+    metros_por_tipo,
+    sumar_cubo,
+    tipo_equipo,
+)
+from linea_tiempo import turno_de_bitacora, turnos_en
+from validacion import marcar_intervalos, reparar_intervalos, resumen_problemas, tabla_problemas
+
+HORAS_TURNO = 12
+
+
+def minutos_a_hhmm(mins):
+    h = int(mins // 60)
+    m = int(mins % 60)
+    return f"{h:02d}:{m:02d}"
+
+
+# Estilo de la tabla entera de una vez (Styler.apply con axis=None)
+def resaltar_rtr(df):
+    rtr = (tipo_equipo(df["Equipo"]) == "RTR").to_numpy()
+    estilos = pd.DataFrame("", index=df.index, columns=df.columns)
+    estilos.loc[rtr] = "background-color: #00B050"
+    return estilos
+
+
+def promedios_en_porcentaje(promedios):
+    return promedios.assign(
+        DM=lambda x: (x["DM"] * 100).round(1).astype(str) + "%",
+        UE=lambda x: (x["UE"] * 100).round(1).astype(str) + "%",
+    )
+
+
+# Columnas de presentación del Gantt y orden de dibujo
+def preparar_intervalos(df):
+    df["DuracionTexto"] = texto_duracion(df["Segundos"])
+
+    df = df.sort_values(["Equipo", "Hora Inicio"]).reset_index(drop=True)
+
+    df["Equipo_label"] = etiquetas_equipo(df)
+
+    return df
+
+
+def _estado_actual(df):
+    df_sorted = df.sort_values(["Equipo", "Hora Fin"])
+
+    return (
+        df_sorted
+        .groupby("Equipo", observed=True)
+        .tail(1)
+        [["Equipo", "Estado", "Ubicacion"]]
+        .rename(columns={"Ubicacion": "Ubicación / Frente"})
+    )
+
+
+def grafico_demoras(cubo):
+    df_pie = (
+        sumar_cubo(cubo, "Descripcion", Estado="Demora") / 60
+    ).reset_index(name="Duracion_min")
+
+    df_pie["Porcentaje"] = (df_pie["Duracion_min"] / df_pie["Duracion_min"].sum()) * 100
+
+    fig_pie = px.pie(
+        df_pie,
+        names="Descripcion",
+        values="Duracion_min",
+        hover_data=["Duracion_min", "Porcentaje"],
+        labels={"Duracion_min":"Minutos", "Descripcion":"Tipo de demora"}
+    )
+
+    fig_pie.update_traces(
+        textinfo="percent+label",
+        hovertemplate="<b>%{label}</b><br>Tiempo acumulado: %{value:.0f} min<br>Porcentaje: %{percent}"
+    )
+    fig_pie.update_layout(
+        paper_bgcolor="white",
+        plot_bgcolor="white",
+        font=dict(color="black"),
+        legend=dict(
+            font=dict(color="black"),
+            bgcolor="rgba(0,0,0,0)",
+            borderwidth=0
+        )
+    )
+
+    return fig_pie
+
+
+def grafico_estados(cubo):
+    df_pie_estado = (sumar_cubo(cubo, "Estado") / 60).reset_index(name="Duracion_min")
+
+    df_pie_estado["Duracion_HHMM"] = df_pie_estado["Duracion_min"].apply(minutos_a_hhmm)
+
+    df_pie_estado["Porcentaje"] = (df_pie_estado["Duracion_min"] / df_pie_estado["Duracion_min"].sum()) * 100
+
+    fig_pie_estado = px.pie(
+        df_pie_estado,
+        names="Estado",
+        values="Duracion_min",
+        color="Estado",
+        color_discrete_map=COLORES_ESTADO,
+    )
+
+    fig_pie_estado.update_traces(
+        customdata=df_pie_estado[["Duracion_HHMM", "Porcentaje"]],
+        texttemplate="%{label}<br>%{customdata[0]}<br>%{percent}",  # <-- incluir %{label}
+        textposition="inside",
+        textfont=dict(color="black", size=14),
+        hovertemplate="<b>%{label}</b><br>Tiempo acumulado: %{customdata[0]}<br>Porcentaje: %{customdata[1]:.1f}%"
+    )
+
+    fig_pie_estado.update_layout(
+        paper_bgcolor="white",
+        plot_bgcolor="white",
+        font=dict(color="black"),
+        legend=dict(
+            font=dict(color="black"),
+            bgcolor="rgba(0,0,0,0)",
+            borderwidth=0
+        )
+    )
+
+    return fig_pie_estado
+
+
+# Tabla "ESTADO ACTUAL POR EQUIPO": último estado y ubicación de cada
+# equipo más su producción acumulada (segundos operativos por Equipo)
+def tabla_estado_actual(estado_actual, seg_operativos):
+    df_prod_acum = (seg_operativos / 60).reset_index(name="Minutos")
+
+    df_prod_acum["Producción acumulada"] = df_prod_acum["Minutos"].apply(minutos_a_hhmm)
+
+    df_resumen = estado_actual.merge(
+        df_prod_acum[["Equipo", "Producción acumulada"]],
+        on="Equipo",
+        how="left"
+    )
+
+    df_resumen["Producción acumulada"] = df_resumen["Producción acumulada"].fillna("00:00")
+
+    return df_resumen.sort_values("Equipo").reset_index(drop=True)
+
+
+# Metros al fin del turno si cada equipo mantiene su operatividad actual
+def metros_proyectados(seg_totales, seg_operativos):
+    df_proj = pd.DataFrame({
+        "Horas_totales": seg_totales / 3600,
+        "Horas_operativas": (seg_operativos / 3600).reindex(seg_totales.index).fillna(0),
+    })
+
+    df_proj["Operatividad"] = df_proj["Horas_operativas"] / df_proj["Horas_totales"]
+
+    df_proj["Horas_proj"] = df_proj["Operatividad"] * HORAS_TURNO
+
+    return metros_por_tipo(calcular_metraje(df_proj["Horas_proj"], solo_positivas=True))
+
+
+# =====================================================
+# RESUMEN DEL TURNO
+# =====================================================
+# Todo lo que el tablero muestra debajo del Gantt. Cada parte se calcula
+# la primera vez que se pide y queda guardada en el objeto: una pantalla
+# que solo muestra el Gantt no arma tablas ni pies, y como no depende de
+# la sesión, lo ya calculado sirve a todas las pantallas del mismo turno.
+class ResumenTurno:
+    def __init__(self, df, cubo, en_vivo=None):
+        self.df = df
+        self.cubo = cubo
+        # Vistas ya calculadas por el motor en vivo (EstadoEnVivo.vistas)
+        self.en_vivo = en_vivo or {}
+
+    @cached_property
+    def _seg_operativos(self):
+        return sumar_cubo(self.cubo, "Equipo", Estado="Operativo")
+
+    @cached_property
+    def df_resumen(self):
+        if "df_resumen" in self.en_vivo:
+            return self.en_vivo["df_resumen"]
+        return tabla_estado_actual(_estado_actual(self.df), self._seg_operativos)
+
+    @cached_property
+    def _metros_acumulados(self):
+        if "metros_acumulados" in self.en_vivo:
+            return self.en_vivo["metros_acumulados"]
+        return metros_por_tipo(calcular_metraje(self._seg_operativos / 3600))
+
+    @property
+    def x_metros_dth(self):
+        return self._metros_acumulados["DTH"]
+
+    @property
+    def y_metros_rtr(self):
+        return self._metros_acumulados["RTR"]
+
+    @cached_property
+    def _metros_proyectados(self):
+        if "metros_proyectados" in self.en_vivo:
+            return self.en_vivo["metros_proyectados"]
+        # Solo intervalos con Estado definido cuentan para las horas totales
+        seg_totales = (
+            sumar_cubo(self.cubo, ["Equipo", "Estado"]).groupby(level="Equipo", observed=True).sum()
+        )
+        return metros_proyectados(seg_totales, self._seg_operativos)
+
+    @property
+    def metraje_dth_proj(self):
+        return self._metros_proyectados["DTH"]
+
+    @property
+    def metraje_rtr_proj(self):
+        return self._metros_proyectados["RTR"]
+
+    @cached_property
+    def promedios(self):
+        df_pivot = calcular_dm_ue(horas_por_categoria(self.cubo))
+
+        return (
+            df_pivot.groupby("Tipo")[["DM", "UE"]]
+            .mean()
+            .reset_index()
+        )
+
+    @cached_property
+    def fig_pie(self):
+        return grafico_demoras(self.cubo)
+
+    @cached_property
+    def fig_pie_estado(self):
+        return grafico_estados(self.cubo)
+
+
+def calcular_resumen(df, cubo, en_vivo=None):
+    return ResumenTurno(df, cubo, en_vivo)
+
+
+@dataclass
+class TurnoProcesado:
+    df: pd.DataFrame
+    cubo: pd.Series
+    resumen: ResumenTurno
+    problemas: pd.DataFrame
+    validacion: dict
+    turnos: list
+    turno_bitacora: tuple | None
+
+
+# Con un acumulador (recarga incremental) el cubo solo se actualiza con
+# las filas agregadas al final desde la última bitácora (en el orden del
+# archivo, antes de ordenar para el Gantt) y el resumen toma la tabla de
+# estado y los metros del motor en vivo que el acumulador alimenta. Los problemas de
+# solapes y huecos se reportan siempre sobre la bitácora original; con
+# `reparar` los agregados salen de la bitácora ya reparada. Los turnos que
+# abarca y el turno de la bitácora (para el histórico, según `nombre`) se
+# calculan aquí una vez y quedan en el resultado compartido.
+def procesar_turno(df, acumulador=None, reparar=False, nombre=None):
+    marcas = marcar_intervalos(df)
+    problemas = tabla_problemas(df, marcas)
+    validacion = resumen_problemas(marcas)
+    if reparar:
+        df = reparar_intervalos(df, marcas)
+
+    cubo, en_vivo = acumulador.actualizar(df) if acumulador is not None else (None, None)
+    df = preparar_intervalos(df)
+    if cubo is None:
+        cubo = cubo_duraciones(df)
+    return TurnoProcesado(
+        df=df,
+        cubo=cubo,
+        resumen=calcular_resumen(df, cubo, en_vivo),
+        problemas=problemas,
+        validacion=validacion,
+        turnos=turnos_en(df),
+        turno_bitacora=turno_de_bitacora(df, nombre),
+    )
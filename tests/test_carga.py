@@ -0,0 +1,50 @@
+from datetime import date
+
+import pandas as pd
+
+from carga import leer_bitacora
+
+FECHA = date(2026, 2, 4)
+
+
+def _bitacora(filas):
+    texto = "Equipo,Hora Inicio,Hora Fin,Descripcion,Estado\n" + "\n".join(filas) + "\n"
+    return leer_bitacora(texto.encode(), FECHA, "bitacora.csv")
+
+
+def test_fila_que_cubre_toda_la_noche():
+    df = _bitacora(["TD030,19:00,07:00,Perforando,Operativo"])
+
+    assert df.loc[0, "Hora Inicio"] == pd.Timestamp("2026-02-04 19:00")
+    assert df.loc[0, "Hora Fin"] == pd.Timestamp("2026-02-05 07:00")
+    assert df.loc[0, "Segundos"] == 12 * 3600
+
+
+def test_fila_nocturna_que_empieza_antes_del_turno():
+    df = _bitacora(["TD030,18:30,07:00,Perforando,Operativo"])
+
+    assert df.loc[0, "Hora Fin"] == pd.Timestamp("2026-02-05 07:00")
+    assert df.loc[0, "Segundos"] == 12.5 * 3600
+
+
+def test_turno_noche_cruza_la_medianoche():
+    df = _bitacora([
+        "TD031,19:00,23:00,Perforando,Operativo",
+        "TD031,23:00,02:00,Perforando,Operativo",
+        "TD031,02:00,07:00,Perforando,Operativo",
+        "TD012,01:00,07:00,Perforando,Operativo",
+    ])
+
+    assert list(df["Hora Inicio"].dt.day) == [4, 4, 5, 5]
+    assert list(df["Hora Fin"].dt.day) == [4, 5, 5, 5]
+    assert (df["Segundos"] > 0).all()
+
+
+def test_turno_dia_no_cambia_de_fecha():
+    df = _bitacora([
+        "TD012,07:00,12:00,Perforando,Operativo",
+        "TD012,12:00,18:30,Perforando,Operativo",
+    ])
+
+    assert (df["Hora Inicio"].dt.date == FECHA).all()
+    assert (df["Hora Fin"].dt.date == FECHA).all()
@@ -0,0 +1,96 @@
+from datetime import date
+
+import pandas as pd
+import pytest
+
+import incremental
+from carga import leer_bitacora
+from en_vivo import EstadoEnVivo, eventos_de
+from incremental import AcumuladorTurno
+from kpis import cubo_duraciones
+from tablero import ResumenTurno, procesar_turno
+
+FECHA = date(2026, 2, 4)
+
+FILAS = [
+    "TD011,07:00,09:00,Perforando,Operativo,F1,Operativo",
+    "TD091,07:00,08:30,Perforando,Operativo,F2,Operativo",
+    "TD012,07:00,10:00,Perforando,Operativo,F3,Operativo",
+    "TD011,09:00,09:45,Cambio de broca,Demora,F1,Demora Operativa",
+    "TD091,08:30,11:00,Falla hidráulica,Mantenimiento,F2,Mantenimiento Correctivo",
+    "TD011,09:45,12:00,Perforando,Operativo,F4,Operativo",
+    "TD012,10:00,10:20,Traslado,Demora,F3,Demora Operativa",
+    "TD012,10:20,12:30,Perforando,Operativo,F5,Operativo",
+]
+
+
+def _bitacora(filas):
+    texto = (
+        "Equipo,Hora Inicio,Hora Fin,Descripcion,Estado,Ubicacion,Categoria\n"
+        + "\n".join(filas) + "\n"
+    )
+    return leer_bitacora(texto.encode(), FECHA, "bitacora.csv")
+
+
+def _mismo_resumen(vistas, resumen):
+    pd.testing.assert_frame_equal(
+        vistas["df_resumen"].astype(object), resumen.df_resumen.astype(object)
+    )
+    pd.testing.assert_series_equal(vistas["metros_acumulados"], resumen._metros_acumulados)
+    pd.testing.assert_series_equal(vistas["metros_proyectados"], resumen._metros_proyectados)
+
+
+def test_motor_igual_al_resumen():
+    df = _bitacora(FILAS)
+    resumen = ResumenTurno(df, cubo_duraciones(df))
+
+    motor = EstadoEnVivo().consumir(eventos_de(df))
+    _mismo_resumen(motor.vistas(), resumen)
+    _mismo_resumen(EstadoEnVivo.desde(df).vistas(), resumen)
+
+    operativos = cubo_duraciones(df).xs("Operativo", level="Estado").groupby(
+        level="Equipo", observed=True).sum()
+    totales = cubo_duraciones(df).groupby(level="Equipo", observed=True).sum()
+    esperado = (operativos / totales).to_dict()
+    assert motor.operatividad().to_dict() == pytest.approx(esperado)
+
+
+def test_intervalo_reenviado_reemplaza_al_anterior():
+    df = _bitacora(FILAS)
+    motor = EstadoEnVivo().consumir(eventos_de(df))
+    antes = motor.segundos_por_estado()
+
+    # El mismo intervalo dos veces no suma dos veces
+    motor.consumir(eventos_de(df.iloc[[-1]]))
+    pd.testing.assert_series_equal(motor.segundos_por_estado(), antes)
+
+    # Un intervalo abierto que se alarga reemplaza lo que aportaba
+    alargado = _bitacora(FILAS[:-1] + ["TD012,10:20,13:00,Perforando,Operativo,F5,Operativo"])
+    motor.consumir(eventos_de(alargado.iloc[[-1]]))
+    assert motor.segundos_por_estado()["TD012", "Operativo"] == (3 * 60 + 160) * 60
+    _mismo_resumen(motor.vistas(), ResumenTurno(alargado, cubo_duraciones(alargado)))
+
+
+@pytest.mark.parametrize("filas_minimas", [0, incremental.FILAS_MINIMAS_INCREMENTAL])
+def test_recarga_incremental_alimenta_el_motor(monkeypatch, filas_minimas):
+    monkeypatch.setattr(incremental, "FILAS_MINIMAS_INCREMENTAL", filas_minimas)
+    acumulador = AcumuladorTurno()
+
+    # Filas que se agregan, una recarga sin cambios y la última fila
+    # abierta que se alarga
+    recargas = [
+        FILAS[:3],
+        FILAS[:5],
+        FILAS[:5],
+        FILAS,
+        FILAS[:-1] + ["TD012,10:20,13:00,Perforando,Operativo,F5,Operativo"],
+    ]
+    for filas in recargas:
+        procesado = procesar_turno(_bitacora(filas), acumulador)
+        completo = procesar_turno(_bitacora(filas))
+        vistas = {
+            "df_resumen": procesado.resumen.df_resumen,
+            "metros_acumulados": procesado.resumen._metros_acumulados,
+            "metros_proyectados": procesado.resumen._metros_proyectados,
+        }
+        _mismo_resumen(vistas, completo.resumen)
@@ -0,0 +1,21 @@
+import pandas as pd
+
+import equipos
+from equipos import tajo_de_filas
+
+
+def test_tajo_de_la_ubicacion_o_del_registro(monkeypatch):
+    registro = equipos.REGISTRO.copy()
+    registro.loc["TD011", "Tajo"] = "Chalcobamba"
+    monkeypatch.setattr(equipos, "REGISTRO", registro)
+
+    df = pd.DataFrame({
+        "Equipo": ["TD011", "TD011", "TD012", "TD999"],
+        "Ubicacion": ["Ferrobamba Fase 5", None, None, " Chalcobamba F2"],
+    })
+
+    tajo = tajo_de_filas(df)
+
+    assert tajo.tolist()[:2] == ["Ferrobamba", "Chalcobamba"]
+    assert pd.isna(tajo[2])
+    assert tajo[3] == "Chalcobamba"
@@ -0,0 +1,32 @@
+from datetime import datetime
+
+import pytest
+
+from turnos import turno_del_nombre
+
+
+@pytest.mark.parametrize("nombre, esperado", [
+    ("bitacora_2026-02-06_TN.xlsx", ("T/N", datetime(2026, 2, 6))),
+    ("bitacora_2026-02-05_TD.xlsx", ("T/D", datetime(2026, 2, 5))),
+    ("estado T-N 06-02-2026.csv", ("T/N", datetime(2026, 2, 6))),
+    ("TD_2026-02-05.parquet", ("T/D", datetime(2026, 2, 5))),
+])
+def test_turno_y_fecha_del_nombre(nombre, esperado):
+    assert turno_del_nombre(nombre) == esperado
+
+
+@pytest.mark.parametrize("nombre", [
+    "ESTADO TD091 06-02-2026.xlsx",
+    "ESTADO TN012 06-02-2026.xlsx",
+    "bitacora_TD030_2026-02-06.csv",
+    "STD 06-02-2026.xlsx",
+])
+def test_equipo_en_el_nombre_no_es_turno(nombre):
+    turno, fecha = turno_del_nombre(nombre)
+
+    assert turno is None
+    assert fecha == datetime(2026, 2, 6)
+
+
+def test_equipo_y_turno_en_el_nombre():
+    assert turno_del_nombre("ESTADO TD091 TN 06-02-2026.xlsx")[0] == "T/N"
@@ -0,0 +1,59 @@
+import re
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+PATRON_FECHA_ISO = re.compile(r"(\d{4})[-_.](\d{2})[-_.](\d{2})")
+PATRON_FECHA_DMY = re.compile(r"(\d{2})[-_.](\d{2})[-_.](\d{4})")
+# Acotado por ambos lados para no leer un equipo ("TD091") como turno
+PATRON_TURNO = re.compile(r"(?<![A-Za-z0-9])T[/_-]?([DN])(?![A-Za-z0-9])", re.IGNORECASE)
+
+
+def hora_local():
+    return datetime.utcnow() - timedelta(hours=5)
+
+
+# T/D de 07:00 a 19:00; T/N de 19:00 a 07:00, con fecha de operación la
+# del día en que empezó (la madrugada pertenece a la noche anterior).
+def calcular_turno(momento):
+    hora = momento.hour
+
+    if 7 <= hora < 19:
+        turno = "T/D"
+        fecha_operacion = momento
+    else:
+        turno = "T/N"
+        if hora < 7:
+            fecha_operacion = momento - timedelta(days=1)
+        else:
+            fecha_operacion = momento
+
+    return turno, fecha_operacion
+
+
+# Versión columnar de calcular_turno: turno y fecha de operación de cada
+# marca de tiempo de una serie.
+def turnos_de(horas):
+    hora = horas.dt.hour
+    turno = pd.Series(
+        np.where((hora >= 7) & (hora < 19), "T/D", "T/N"), index=horas.index
+    ).where(horas.notna())
+    fecha_operacion = horas.dt.normalize() - pd.to_timedelta((hora < 7).astype("int64"), unit="D")
+    return turno, fecha_operacion
+
+
+# Turno y fecha de operación escritos en el nombre de una bitácora (p. ej.
+# "bitacora_2026-02-06_TN.xlsx"); None en lo que el nombre no trae.
+def turno_del_nombre(nombre):
+    turno = fecha = None
+
+    if m := PATRON_FECHA_ISO.search(nombre):
+        fecha = datetime(int(m[1]), int(m[2]), int(m[3]))
+    elif m := PATRON_FECHA_DMY.search(nombre):
+        fecha = datetime(int(m[3]), int(m[2]), int(m[1]))
+
+    if m := PATRON_TURNO.search(nombre):
+        turno = f"T/{m[1].upper()}"
+
+    return turno, fecha
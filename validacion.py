@@ -0,0 +1,107 @@
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+# Huecos menores que esto (redondeos de la exportación) no se reportan
+TOLERANCIA_HUECO = timedelta(minutes=1)
+
+COLUMNAS_MARCAS = ["Sin hora", "Duración negativa", "Solape (s)", "Hueco (s)"]
+
+
+# =====================================================
+# VALIDACION DE INTERVALOS POR EQUIPO
+# =====================================================
+# Una pasada vectorizada por equipo, en orden de inicio: cada intervalo se
+# compara con lo que ya cubrían los anteriores del mismo equipo (máximo
+# acumulado de Hora Fin), así un intervalo largo que contiene a varios
+# cortos los marca a todos. Filas sin hora (convertir_hora devolvió None)
+# o con fin antes del inicio quedan fuera de la comparación.
+def marcar_intervalos(df, tolerancia_hueco=TOLERANCIA_HUECO):
+    orden = df.sort_values(["Equipo", "Hora Inicio"], kind="stable")
+    equipo = orden["Equipo"]
+    inicio, fin = orden["Hora Inicio"], orden["Hora Fin"]
+
+    sin_hora = inicio.isna() | fin.isna()
+    negativa = ~sin_hora & (fin < inicio)
+    valida = ~sin_hora & ~negativa
+
+    cubierto = fin.where(valida).groupby(equipo, observed=True).cummax()
+    cubierto = cubierto.groupby(equipo, observed=True).ffill()
+    cubierto_antes = cubierto.groupby(equipo, observed=True).shift()
+
+    hasta = cubierto_antes.where(~(cubierto_antes > fin), fin)
+    solape = (hasta - inicio).where(valida).dt.total_seconds().clip(lower=0)
+    hueco = (inicio - cubierto_antes).where(valida).dt.total_seconds().clip(lower=0)
+    hueco = hueco.where(hueco >= tolerancia_hueco.total_seconds(), 0)
+
+    marcas = pd.DataFrame({
+        "Sin hora": sin_hora,
+        "Duración negativa": negativa,
+        "Solape (s)": solape.fillna(0),
+        "Hueco (s)": hueco.fillna(0),
+        "Cubierto hasta": cubierto_antes,
+    })
+    return marcas.reindex(df.index)
+
+
+def con_problemas(marcas):
+    return (
+        marcas["Sin hora"]
+        | marcas["Duración negativa"]
+        | (marcas["Solape (s)"] > 0)
+        | (marcas["Hueco (s)"] > 0)
+    )
+
+
+# Filas con algún problema, con una descripción legible para el tablero
+def tabla_problemas(df, marcas):
+    filas = con_problemas(marcas)
+    m = marcas[filas]
+
+    problema = np.select(
+        [m["Sin hora"], m["Duración negativa"], m["Solape (s)"] > 0],
+        ["Sin hora", "Duración negativa", "Solape"],
+        default="Hueco",
+    )
+    minutos = np.where(m["Solape (s)"] > 0, m["Solape (s)"], m["Hueco (s)"]) / 60
+
+    tabla = df.loc[filas, ["Equipo", "Hora Inicio", "Hora Fin", "Estado", "Descripcion"]].copy()
+    tabla.insert(0, "Problema", problema)
+    tabla["Minutos"] = minutos.round(1)
+    return tabla.sort_values(["Equipo", "Hora Inicio"]).reset_index(drop=True)
+
+
+def resumen_problemas(marcas):
+    return {
+        "Sin hora": int(marcas["Sin hora"].sum()),
+        "Duración negativa": int(marcas["Duración negativa"].sum()),
+        "Solapes": int((marcas["Solape (s)"] > 0).sum()),
+        "Horas solapadas": float(marcas["Solape (s)"].sum()) / 3600,
+        "Huecos": int((marcas["Hueco (s)"] > 0).sum()),
+        "Horas sin registro": float(marcas["Hueco (s)"].sum()) / 3600,
+    }
+
+
+# =====================================================
+# REPARACION AUTOMATICA
+# =====================================================
+# Quita filas sin hora o con duración negativa, recorta el inicio de cada
+# intervalo solapado hasta donde ya estaba cubierto y elimina los que
+# quedan contenidos por completo en otro. Los huecos no se rellenan.
+def reparar_intervalos(df, marcas):
+    solapado = marcas["Solape (s)"] > 0
+    inicio = df["Hora Inicio"].mask(solapado, marcas["Cubierto hasta"])
+
+    conservar = (
+        ~marcas["Sin hora"]
+        & ~marcas["Duración negativa"]
+        & (inicio < df["Hora Fin"])
+    )
+
+    df = df[conservar].copy()
+    df["Hora Inicio"] = inicio[conservar]
+    df["Segundos"] = (
+        (df["Hora Fin"] - df["Hora Inicio"]).dt.total_seconds().round().astype("Int32")
+    )
+    return df
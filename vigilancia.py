@@ -0,0 +1,95 @@
+import os
+import threading
+from pathlib import Path
+
+from carga import FORMATOS_SOPORTADOS, hash_contenido
+
+
+def _bitacora_mas_reciente(carpeta):
+    candidatos = [
+        e for e in os.scandir(carpeta)
+        if e.is_file()
+        and Path(e.name).suffix.lstrip(".").lower() in FORMATOS_SOPORTADOS
+        and not e.name.startswith("~$")
+    ]
+    if not candidatos:
+        return None
+    return max(candidatos, key=lambda e: e.stat().st_mtime_ns).path
+
+
+# =====================================================
+# VIGILANCIA DE CARPETA / ARCHIVO
+# =====================================================
+# Cada revisión es solo un stat del archivo (o de la carpeta, eligiendo
+# la bitácora más reciente). Si cambió mtime o tamaño, un hilo en segundo
+# plano lee el archivo y, si además cambió el hash, lo pasa a `cargar`
+# (que lo parsea y deja en caché) y sube `version`.
+class VigilanteBitacora:
+    def __init__(self, ruta, cargar):
+        self.ruta = Path(ruta)
+        self.cargar = cargar
+        self.version = 0
+        self.contenido = None
+        self.nombre = None
+        self.error = None
+        self._firma = None
+        self._hash = None
+        self._hilo = None
+        self._lock = threading.Lock()
+
+    def _archivo_actual(self):
+        if self.ruta.is_dir():
+            return _bitacora_mas_reciente(self.ruta)
+        return str(self.ruta) if self.ruta.is_file() else None
+
+    def revisar(self):
+        try:
+            archivo = self._archivo_actual()
+            if archivo is None:
+                self.error = f"No hay bitácoras en {self.ruta}"
+                return False
+            info = os.stat(archivo)
+        except OSError as e:
+            self.error = str(e)
+            return False
+
+        firma = (archivo, info.st_mtime_ns, info.st_size)
+
+        with self._lock:
+            if firma == self._firma or (self._hilo and self._hilo.is_alive()):
+                return False
+            self._firma = firma
+            self._hilo = threading.Thread(
+                target=self._recargar, args=(archivo,), daemon=True
+            )
+            self._hilo.start()
+        return True
+
+    @property
+    def cargando(self):
+        return bool(self._hilo and self._hilo.is_alive())
+
+    def actual(self):
+        with self._lock:
+            return self.version, self.contenido, self.nombre
+
+    def _recargar(self, archivo):
+        try:
+            contenido = Path(archivo).read_bytes()
+            hash_nuevo = hash_contenido(contenido)
+            if hash_nuevo == self._hash:
+                return
+
+            nombre = Path(archivo).name
+            self.cargar(contenido, nombre)
+
+            with self._lock:
+                self.contenido = contenido
+                self.nombre = nombre
+                self._hash = hash_nuevo
+                self.error = None
+                self.version += 1
+        except Exception as e:
+            # Archivo a medio escribir o inválido: se conserva la versión
+            # anterior y se reintenta en el próximo cambio de mtime.
+            self.error = f"{type(e).__name__}: {e}"